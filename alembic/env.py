@@ -5,7 +5,7 @@ import sys
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, inspect, pool
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -22,6 +22,24 @@ config.set_main_option("sqlalchemy.url", DATABASE_URL)
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The SQLite full-text index and its shadow tables are managed by hand.
+    if type_ == "table" and name.startswith("pans_fts"):
+        return False
+    return True
+
+
+# Databases built by create_all before Alembic was adopted have the initial
+# schema but no version table; they are stamped at this revision first.
+BASELINE_REVISION = "20260203_0001"
+
+
+def stamp_unversioned_database(connection) -> None:
+    tables = set(inspect(connection).get_table_names())
+    if "pans" in tables and "alembic_version" not in tables:
+        context.get_context().stamp(context.script, BASELINE_REVISION)
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -30,6 +48,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -48,9 +67,11 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
+            stamp_unversioned_database(connection)
             context.run_migrations()
 
 
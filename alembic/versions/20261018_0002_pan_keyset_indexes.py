@@ -0,0 +1,26 @@
+"""Add keyset pagination indexes on pans
+
+Revision ID: 20261018_0002
+Revises: 20260203_0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261018_0002"
+down_revision = "20260203_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_pans_name_id", "pans", ["name", "id"])
+    op.create_index("ix_pans_capacity_name_id", "pans", ["capacity_label", "name", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pans_capacity_name_id", table_name="pans")
+    op.drop_index("ix_pans_name_id", table_name="pans")
@@ -0,0 +1,58 @@
+"""Add pan search index
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261018_0003"
+down_revision = "20261018_0002"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pans_fts USING fts5("
+    "name, capacity_label, content='pans', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_ai AFTER INSERT ON pans BEGIN "
+    "INSERT INTO pans_fts(rowid, name, capacity_label) VALUES (new.id, new.name, new.capacity_label); END",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_ad AFTER DELETE ON pans BEGIN "
+    "INSERT INTO pans_fts(pans_fts, rowid, name, capacity_label) "
+    "VALUES ('delete', old.id, old.name, old.capacity_label); END",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_au AFTER UPDATE ON pans BEGIN "
+    "INSERT INTO pans_fts(pans_fts, rowid, name, capacity_label) "
+    "VALUES ('delete', old.id, old.name, old.capacity_label); "
+    "INSERT INTO pans_fts(rowid, name, capacity_label) VALUES (new.id, new.name, new.capacity_label); END",
+    "INSERT INTO pans_fts(pans_fts) VALUES ('rebuild')",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS pans_fts_au",
+    "DROP TRIGGER IF EXISTS pans_fts_ad",
+    "DROP TRIGGER IF EXISTS pans_fts_ai",
+    "DROP TABLE IF EXISTS pans_fts",
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_pans_name_trgm ON pans USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_pans_name_trgm")
@@ -0,0 +1,45 @@
+"""Create weigh_ins history table
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0004"
+down_revision = "20261018_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weigh_ins",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("pan_id", sa.Integer(), nullable=False),
+        sa.Column("pan_weight_grams", sa.Float(), nullable=False),
+        sa.Column("total_weight_grams", sa.Float(), nullable=False),
+        sa.Column("total_carbs", sa.Float(), nullable=False),
+        sa.Column("target_servings", sa.Integer(), nullable=True),
+        sa.Column("target_min_grams", sa.Float(), nullable=False),
+        sa.Column("target_max_grams", sa.Float(), nullable=False),
+        sa.Column("net_weight_grams", sa.Float(), nullable=False),
+        sa.Column("servings", sa.Integer(), nullable=False),
+        sa.Column("serving_weight_grams", sa.Float(), nullable=False),
+        sa.Column("carbs_per_serving", sa.Float(), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_weigh_ins_recorded_at", "weigh_ins", ["recorded_at"])
+    op.create_index("ix_weigh_ins_pan_recorded_at", "weigh_ins", ["pan_id", "recorded_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weigh_ins_pan_recorded_at", table_name="weigh_ins")
+    op.drop_index("ix_weigh_ins_recorded_at", table_name="weigh_ins")
+    op.drop_table("weigh_ins")
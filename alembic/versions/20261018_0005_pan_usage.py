@@ -0,0 +1,32 @@
+"""Create pan_usage table
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0005"
+down_revision = "20261018_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pan_usage",
+        sa.Column("pan_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("use_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_pan_usage_last_used_at", "pan_usage", ["last_used_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pan_usage_last_used_at", table_name="pan_usage")
+    op.drop_table("pan_usage")
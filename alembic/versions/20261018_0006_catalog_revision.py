@@ -0,0 +1,65 @@
+"""Add trigger-maintained catalog revision
+
+Revision ID: 20261018_0006
+Revises: 20261018_0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0006"
+down_revision = "20261018_0005"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_TRIGGERS = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS pans_catalog_revision_{suffix} AFTER {operation} ON pans BEGIN "
+    "UPDATE catalog_revision SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1; END"
+    for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+
+POSTGRES_UPGRADE = (
+    "CREATE OR REPLACE FUNCTION bump_catalog_revision() RETURNS trigger AS $$ BEGIN "
+    "UPDATE catalog_revision SET revision = revision + 1, updated_at = now() WHERE id = 1; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER pans_catalog_revision AFTER INSERT OR UPDATE OR DELETE ON pans "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_revision()",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_revision",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("revision", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.execute("INSERT INTO catalog_revision (id, revision) VALUES (1, 0)")
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for suffix in ("ad", "au", "ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS pans_catalog_revision_{suffix}")
+    elif dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS pans_catalog_revision ON pans")
+        op.execute("DROP FUNCTION IF EXISTS bump_catalog_revision()")
+    op.drop_table("catalog_revision")
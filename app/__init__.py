@@ -1,23 +1,48 @@
 """CarbSmart application package."""
 
-from importlib.metadata import version, PackageNotFoundError
+from functools import cache
 from pathlib import Path
 
+_PYPROJECT = Path(__file__).resolve().parent.parent / "pyproject.toml"
+_VERSION_FILE = Path(__file__).resolve().parent / "_version.py"
+
+
+@cache
+def get_version() -> str:
+    # Resolved on first use, then cached: a version baked in at build time,
+    # installed package metadata, then pyproject.toml for source checkouts.
+    try:
+        from app._version import version
+
+        return version
+    except ImportError:
+        pass
+
+    from importlib.metadata import PackageNotFoundError, version
 
-def _get_version() -> str:
     try:
         return version("carbsmart")
     except PackageNotFoundError:
         pass
-    # Fall back to reading pyproject.toml directly
+
+    import tomllib
+
     try:
-        toml_path = Path(__file__).resolve().parent.parent / "pyproject.toml"
-        for line in toml_path.read_text().splitlines():
-            if line.strip().startswith("version"):
-                return line.split("=", 1)[1].strip().strip('"')
-    except OSError:
+        with _PYPROJECT.open("rb") as f:
+            return tomllib.load(f)["project"]["version"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
         pass
     return "unknown"
 
 
-__version__ = _get_version()
+def bake_version() -> str:
+    """Write the resolved version to ``app/_version.py`` for image builds."""
+    resolved = get_version()
+    _VERSION_FILE.write_text(f'version = "{resolved}"\n')
+    return resolved
+
+
+def __getattr__(name: str) -> str:
+    if name == "__version__":
+        return get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,27 @@
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when installed, compact stdlib JSON otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_json_response(adapter: TypeAdapter, value: Any, response: Response | None = None) -> Response:
+    """Validate and serialize ``value`` in one pass through Pydantic's core.
+
+    For large payloads this skips the intermediate dicts FastAPI builds when
+    a route returns plain objects. Headers set on ``response`` are kept.
+    """
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return Response(body, media_type="application/json", headers=headers)
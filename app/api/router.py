@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
-from app.api.routes import calc, pans
+from app.api.routes import calc, pans, weigh_ins
 
 api_router = APIRouter()
 api_router.include_router(pans.router, prefix="/pans", tags=["pans"])
 api_router.include_router(calc.router, prefix="/calc", tags=["calc"])
+api_router.include_router(weigh_ins.router, prefix="/weigh-ins", tags=["weigh-ins"])
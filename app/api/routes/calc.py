@@ -1,17 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 
-from app.db import get_db
-from app.models import CalcRequest, CalcResponse
+from app.api.responses import model_json_response
+from app.db import DbSession, get_db_session
+from app.db_models import Pan
+from app.history import record_weigh_in
+from app.metrics import calculate_plan_seconds
+from app.models import CalcBatchItem, CalcBatchResponse, CalcRequest, CalcResponse
 from app.repositories import pans as pans_repo
 from app.services.calc import calculate_plan
 
 router = APIRouter()
 
+_batch_response = TypeAdapter(CalcBatchResponse)
+# Larger batches get a 422 rather than tying up a worker and the database.
+MAX_BATCH_ITEMS = 1000
 
-@router.post("", response_model=CalcResponse)
-def calculate(payload: CalcRequest, db: Session = Depends(get_db)) -> CalcResponse:
-    pan = pans_repo.get_pan(db, payload.pan_id)
+
+def _calculate(payload: CalcRequest, pan: Pan | None) -> CalcResponse:
     if not pan:
         raise HTTPException(status_code=404, detail="Pan not found")
 
@@ -19,20 +25,56 @@ def calculate(payload: CalcRequest, db: Session = Depends(get_db)) -> CalcRespon
         raise HTTPException(status_code=422, detail="target_min_grams must be <= target_max_grams")
 
     try:
-        net_weight, servings, serving_weight, carbs_per_serving = calculate_plan(
-            payload.total_weight_grams,
-            pan.weight_grams,
-            payload.total_carbs,
-            payload.target_min_grams,
-            payload.target_max_grams,
-            payload.target_servings,
-        )
+        with calculate_plan_seconds.time():
+            plan = calculate_plan(
+                payload.total_weight_grams,
+                pan.weight_grams,
+                payload.total_carbs,
+                payload.target_min_grams,
+                payload.target_max_grams,
+                payload.target_servings,
+            )
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
 
+    record_weigh_in(
+        "api",
+        pan,
+        payload.total_weight_grams,
+        payload.total_carbs,
+        payload.target_min_grams,
+        payload.target_max_grams,
+        payload.target_servings,
+        plan,
+    )
+    net_weight, servings, serving_weight, carbs_per_serving = plan
+
     return CalcResponse(
         net_weight_grams=net_weight,
         servings=servings,
         serving_weight_grams=serving_weight,
         carbs_per_serving=carbs_per_serving,
     )
+
+
+@router.post("", response_model=CalcResponse)
+async def calculate(payload: CalcRequest, db: DbSession = Depends(get_db_session)) -> CalcResponse:
+    return _calculate(payload, await db.run(pans_repo.get_pan, payload.pan_id))
+
+
+@router.post("/batch", response_model=CalcBatchResponse)
+async def calculate_batch(
+    payload: list[CalcRequest] = Body(..., max_length=MAX_BATCH_ITEMS),
+    db: DbSession = Depends(get_db_session),
+) -> Response:
+    pans = await db.run(pans_repo.get_pans_by_ids, [item.pan_id for item in payload])
+
+    items: list[CalcBatchItem] = []
+    for item in payload:
+        try:
+            result = _calculate(item, pans.get(item.pan_id))
+        except HTTPException as exc:
+            items.append(CalcBatchItem(status_code=exc.status_code, error=exc.detail))
+        else:
+            items.append(CalcBatchItem(status_code=200, result=result))
+    return model_json_response(_batch_response, CalcBatchResponse(items=items))
@@ -1,25 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+import io
+import json
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models import Pan, PanCreate, PanUpdate
+from app.api.responses import model_json_response
+from app.conditional import CatalogValidators, catalog_validators
+from app.db import DbSession, get_db_session
+from app.models import Pan, PanCreate, PanImportResult, PanUpdate, PanUsage
+from app.repositories import pan_usage as pan_usage_repo
 from app.repositories import pans as pans_repo
+from app.services import pan_io
 
 router = APIRouter()
 
+_pan_list = TypeAdapter(list[Pan])
+_usage_list = TypeAdapter(list[PanUsage])
+
+# Uploads are spooled to disk past this size so large imports stay off the heap.
+_SPOOL_MAX_BYTES = 1024 * 1024
+_MEDIA_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _encode_cursor(key: tuple[str, int]) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, pan_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise HTTPException(status_code=422, detail="Invalid cursor") from exc
+    if not isinstance(name, str) or not isinstance(pan_id, int):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return name, pan_id
+
 
 @router.get("", response_model=list[Pan])
-def list_pans(db: Session = Depends(get_db)) -> list[Pan]:
-    return pans_repo.list_pans(db)
+async def list_pans(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
+    name_prefix: str | None = Query(default=None),
+    capacity_label: str | None = Query(default=None),
+    validators: CatalogValidators = Depends(catalog_validators),
+    db: DbSession = Depends(get_db_session),
+) -> Response:
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+
+    after = _decode_cursor(cursor) if cursor else None
+    pans, next_key = await db.run(
+        pans_repo.list_pans_page,
+        limit,
+        after=after,
+        name_prefix=name_prefix,
+        capacity_label=capacity_label,
+    )
+    if next_key is not None:
+        next_cursor = _encode_cursor(next_key)
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return model_json_response(_pan_list, pans, response)
+
+
+@router.get("/search", response_model=list[Pan])
+async def search_pans(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: DbSession = Depends(get_db_session),
+) -> Response:
+    return model_json_response(_pan_list, await db.run(pans_repo.search_pans, q, limit))
+
+
+@router.get("/usage", response_model=list[PanUsage])
+async def recent_pan_usage(
+    limit: int = Query(default=20, ge=1, le=1000),
+    db: DbSession = Depends(get_db_session),
+) -> Response:
+    return model_json_response(_usage_list, await db.run(pan_usage_repo.list_recent_usage, limit))
+
+
+@router.post("/import", response_model=PanImportResult)
+async def import_pans(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(default=None),
+    on_conflict: Literal["update", "skip"] = Query(default="update"),
+    db: DbSession = Depends(get_db_session),
+) -> PanImportResult:
+    if format is None:
+        media_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+        format = _MEDIA_TYPES.get(media_type)
+        if format is None:
+            raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=")
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        try:
+            return await db.run(pan_io.import_pans, stream, format, on_conflict)
+        except (UnicodeDecodeError, pan_io.PanImportError) as exc:
+            await db.rollback()
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        except IntegrityError as exc:
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Pan name and capacity already exists",
+            ) from exc
+        finally:
+            stream.detach()
+
+
+@router.get("/export")
+async def export_pans(
+    format: Literal["csv", "ndjson"] = Query(default="ndjson"),
+    db: DbSession = Depends(get_db_session),
+) -> StreamingResponse:
+    render = pan_io.csv_chunk if format == "csv" else pan_io.ndjson_chunk
+
+    async def body():
+        if format == "csv":
+            yield pan_io.csv_header()
+        async for pans in db.stream_partitions(pans_repo.export_statement()):
+            yield render(pans)
+
+    return StreamingResponse(
+        body(),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="pans.{format}"'},
+    )
 
 
 @router.post("", response_model=Pan, status_code=201)
-def create_pan(payload: PanCreate, db: Session = Depends(get_db)) -> Pan:
+async def create_pan(payload: PanCreate, db: DbSession = Depends(get_db_session)) -> Pan:
     try:
-        return pans_repo.create_pan(db, payload)
+        return await db.run(pans_repo.create_pan, payload)
     except IntegrityError as exc:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=409,
             detail="Pan name and capacity already exists",
@@ -27,24 +165,22 @@ def create_pan(payload: PanCreate, db: Session = Depends(get_db)) -> Pan:
 
 
 @router.put("/{pan_id}", response_model=Pan)
-def update_pan(pan_id: int, payload: PanUpdate, db: Session = Depends(get_db)) -> Pan:
-    pan = pans_repo.get_pan(db, pan_id)
-    if not pan:
-        raise HTTPException(status_code=404, detail="Pan not found")
+async def update_pan(pan_id: int, payload: PanUpdate, db: DbSession = Depends(get_db_session)) -> Pan:
     try:
-        return pans_repo.update_pan(db, pan, payload)
+        pan = await db.run(pans_repo.update_pan, pan_id, payload)
     except IntegrityError as exc:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=409,
             detail="Pan name and capacity already exists",
         ) from exc
+    if not pan:
+        raise HTTPException(status_code=404, detail="Pan not found")
+    return pan
 
 
 @router.delete("/{pan_id}", status_code=204)
-def delete_pan(pan_id: int, db: Session = Depends(get_db)) -> None:
-    pan = pans_repo.get_pan(db, pan_id)
-    if not pan:
+async def delete_pan(pan_id: int, db: DbSession = Depends(get_db_session)) -> None:
+    if not await db.run(pans_repo.delete_pan, pan_id):
         raise HTTPException(status_code=404, detail="Pan not found")
-    pans_repo.delete_pan(db, pan)
     return None
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
+
+from app.api.responses import model_json_response
+from app.db import DbSession, get_db_session
+from app.models import WeighIn
+from app.repositories import weigh_ins as weigh_ins_repo
+
+router = APIRouter()
+
+_weigh_in_list = TypeAdapter(list[WeighIn])
+
+
+@router.get("", response_model=list[WeighIn])
+async def list_weigh_ins(
+    limit: int = Query(default=100, ge=1, le=1000),
+    pan_id: int | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    db: DbSession = Depends(get_db_session),
+) -> Response:
+    rows = await db.run(weigh_ins_repo.list_weigh_ins, limit, pan_id=pan_id, since=since, until=until)
+    return model_json_response(_weigh_in_list, rows)
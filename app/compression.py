@@ -0,0 +1,157 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional "compression" extra
+    brotli = None
+
+# Opt-in: usually a reverse proxy compresses, so this is off unless asked for.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "").lower() in {"1", "true", "yes"}
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Dynamic responses favour speed over ratio; static assets are precompressed at max settings.
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Already compressed, or streamed to a client that must see each event as sent.
+UNCOMPRESSED_TYPES = ("text/event-stream", "image/", "audio/", "video/", "font/woff", "application/zip", "application/gzip")
+
+
+class GzipStream:
+    encoding = "gzip"
+
+    def __init__(self, level: int = GZIP_LEVEL) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def process(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.compress(body)
+        return data + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliStream:
+    encoding = "br"
+
+    def __init__(self, quality: int = BROTLI_QUALITY) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionResponder:
+    """Wraps one response, compressing its body with ``stream`` once it is large enough.
+
+    With no stream the body passes through and only ``Vary`` is added.
+    """
+
+    def __init__(self, app, minimum_size: int, stream: GzipStream | BrotliStream | None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.stream = stream
+        self.send = None
+        self.start_message = None
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or content_type.startswith(UNCOMPRESSED_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held back until the first body shows whether to compress.
+                self.start_message = message
+            return
+        if self.passthrough or kind != "http.response.body":
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.started:
+            if self.stream is not None:
+                message["body"] = self.stream.process(body, more_body)
+            await self.send(message)
+            return
+
+        self.started = True
+        if len(body) < self.minimum_size and not more_body:
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.stream is not None:
+            message["body"] = self.stream.process(body, more_body)
+            headers["Content-Encoding"] = self.stream.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(self.start_message)
+        await self.send(message)
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        if name.strip() != coding:
+            continue
+        params = params.strip()
+        if not params.startswith("q="):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class CompressionMiddleware:
+    """Compresses responses of at least ``minimum_size`` bytes with brotli or gzip.
+
+    Brotli is preferred when the client accepts it and the ``brotli`` package
+    is installed. Responses that already carry a ``Content-Encoding`` (such as
+    precompressed static assets) pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        stream: GzipStream | BrotliStream | None = None
+        if brotli is not None and accepts_encoding(accept_encoding, "br"):
+            stream = BrotliStream(self.brotli_quality)
+        elif accepts_encoding(accept_encoding, "gzip"):
+            stream = GzipStream(self.gzip_level)
+        await CompressionResponder(self.app, self.minimum_size, stream)(scope, receive, send)
@@ -0,0 +1,58 @@
+"""HTTP validators for responses derived from the pan catalog.
+
+The ETag combines the catalog revision, the app version, the asset
+manifest and template sources, and the request's path and query, so a
+matching ``If-None-Match`` can be answered with 304 before any ORM
+hydration or template rendering.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from fastapi import Depends, Request, Response
+
+from app import get_version
+from app.db import DbSession, get_db_session
+from app.repositories import pans as pans_repo
+from app.web.static import assets
+from app.web.templates import templates_fingerprint
+
+
+@dataclass(frozen=True)
+class CatalogValidators:
+    etag: str
+    last_modified: datetime | None
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            last_modified = self.last_modified
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in candidates or self.etag.removeprefix("W/") in candidates
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+
+async def catalog_validators(request: Request, db: DbSession = Depends(get_db_session)) -> CatalogValidators:
+    revision, last_updated = await db.run(pans_repo.catalog_fingerprint)
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    build = f"{get_version()}|{assets.digest}|{templates_fingerprint()}"
+    key = f"{build}|{revision}|{request.url.path}?{query}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:20]
+    return CatalogValidators(etag=f'W/"{digest}"', last_modified=last_updated)
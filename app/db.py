@@ -1,16 +1,251 @@
 import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from fastapi import Depends
+from sqlalchemy import Delete, Engine, Insert, Update, create_engine, event, insert, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./carbsmart.db")
+# Optional read replica; read-only queries are routed here when set.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL") or None
+# Opt-in async request path; needs an async driver (aiosqlite, asyncpg or psycopg).
+DB_ASYNC = os.getenv("DB_ASYNC", "").lower() in {"1", "true", "yes"}
+# "create_all" builds missing tables on boot (dev and tests); "check" only
+# verifies the database is at the Alembic head and refuses to start otherwise.
+DB_STARTUP = os.getenv("DB_STARTUP", "create_all")
 
-_connect_args: dict[str, object] = {}
-if DATABASE_URL.startswith("sqlite"):
-    _connect_args = {"check_same_thread": False}
+# SQLite performance profile, applied to every new connection. Set
+# SQLITE_TUNING=0 to fall back to SQLite's own defaults.
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "1") != "0"
+SQLITE_PRAGMAS: dict[str, str | int] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB per connection.
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-16000")),
+}
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "8"))
 
-engine = create_engine(DATABASE_URL, connect_args=_connect_args)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+# Pool settings for server databases such as Postgres.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+
+class PoolMetrics:
+    """Checkout counts and time spent waiting for a pooled connection."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """``TimedQueuePool`` for async engines."""
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, pragmas: dict[str, str | int]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _engine_kwargs(url: str, is_async: bool = False) -> dict[str, Any]:
+    poolclass = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+    if not url.startswith("sqlite"):
+        return {
+            "poolclass": poolclass,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+        }
+    kwargs: dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if not _is_memory_sqlite(url):
+        # WAL lets readers proceed during a write, so keep a pool of
+        # connections (each with its own page cache) rather than one.
+        kwargs.update(poolclass=poolclass, pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+    return kwargs
+
+
+def tune_sqlite_engine(engine: Engine, url: str) -> None:
+    if not url.startswith("sqlite") or not SQLITE_TUNING:
+        return
+    pragmas = dict(SQLITE_PRAGMAS)
+    if _is_memory_sqlite(url):
+        pragmas.pop("journal_mode")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def create_app_engine(url: str, **kwargs: Any) -> Engine:
+    engine = create_engine(url, **{**_engine_kwargs(url), **kwargs})
+    tune_sqlite_engine(engine, url)
+    return engine
+
+
+class RoutingSession(Session):
+    """Session that sends reads to ``replica_bind`` and writes to the primary.
+
+    Once the session has flushed anything it stays on the primary, so a
+    request reads its own writes regardless of replica lag.
+    """
+
+    def __init__(self, *args: Any, replica_bind: Engine | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica_bind is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.wrote = True
+        if self.wrote:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self.replica_bind
+
+
+def pool_stats(engine: Engine) -> dict[str, float | int]:
+    pool = engine.pool
+    stats: dict[str, float | int] = {}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_total=metrics.wait_seconds_total,
+            wait_seconds_max=metrics.wait_seconds_max,
+        )
+    return stats
+
+
+engine = create_app_engine(DATABASE_URL)
+replica_engine = create_app_engine(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else None
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=RoutingSession,
+    replica_bind=replica_engine,
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
+)
+
+
+def db_pool_stats() -> dict[str, dict[str, float | int]]:
+    stats = {"primary": pool_stats(engine)}
+    if replica_engine is not None:
+        stats["replica"] = pool_stats(replica_engine)
+    for name, async_engine in _async_engines.items():
+        stats[name] = pool_stats(async_engine.sync_engine)
+    return stats
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url.removeprefix("sqlite:")
+    if url.startswith(("postgresql:", "postgresql+psycopg2:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+_async_sessionmaker = None
+# Async engines by /health name, filled in when the async path is first used.
+_async_engines: dict[str, Any] = {}
+
+
+def create_async_app_engine(url: str, **kwargs: Any) -> Any:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(url, **{**_engine_kwargs(url, is_async=True), **kwargs})
+    tune_sqlite_engine(async_engine.sync_engine, url)
+    return async_engine
+
+
+def get_async_sessionmaker():
+    # Built on first use so the async driver is only imported in async mode.
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        async_engine = create_async_app_engine(ASYNC_DATABASE_URL)
+        _async_engines["async_primary"] = async_engine
+        async_replica = None
+        if REPLICA_DATABASE_URL:
+            replica_url = os.getenv("ASYNC_REPLICA_DATABASE_URL") or _async_url(REPLICA_DATABASE_URL)
+            async_replica = create_async_app_engine(replica_url)
+            _async_engines["async_replica"] = async_replica
+        _async_sessionmaker = async_sessionmaker(
+            bind=async_engine,
+            sync_session_class=RoutingSession,
+            replica_bind=async_replica.sync_engine if async_replica is not None else None,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+    return _async_sessionmaker
 
 
 class Base(DeclarativeBase):
@@ -25,7 +260,125 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[Any]:
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+class DbSession:
+    """Runs repository functions for async routes.
+
+    Wraps either a sync ``Session`` (calls hop to the threadpool) or an
+    ``AsyncSession`` (calls run through ``run_sync`` on the event loop, so
+    no worker thread is held while waiting on the database).
+    """
+
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    @property
+    def is_async(self) -> bool:
+        return not isinstance(self.session, Session)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def rollback(self) -> None:
+        if self.is_async:
+            await self.session.rollback()
+        else:
+            await run_in_threadpool(self.session.rollback)
+
+    async def stream_partitions(self, statement: Any, size: int = 1000) -> AsyncIterator[list[Any]]:
+        """Yield the ORM results of ``statement`` in lists of up to ``size``.
+
+        Rows are fetched with ``yield_per`` on a session of their own, so the
+        stream can outlive the request's session and never holds the table.
+        """
+        statement = statement.execution_options(yield_per=size)
+        if self.is_async:
+            from sqlalchemy.ext.asyncio import AsyncSession
+
+            async with AsyncSession(self.session.bind) as session:
+                result = await session.stream_scalars(statement)
+                async for partition in result.partitions():
+                    yield partition
+            return
+        session = Session(bind=self.session.get_bind(clause=statement))
+        try:
+            result = await run_in_threadpool(session.scalars, statement)
+            while partition := await run_in_threadpool(result.fetchmany, size):
+                yield partition
+        finally:
+            await run_in_threadpool(session.close)
+
+
+def upsert_insert(db: Session, entity: Any):
+    """Return an ``INSERT`` for ``entity`` that supports ``on_conflict_do_*``, or None.
+
+    SQLite and Postgres have ON CONFLICT; callers fall back to a separate
+    insert and update on other dialects.
+    """
+    dialect = db.get_bind(clause=insert(entity)).dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(entity)
+
+
+async def _sync_db_session(db: Session = Depends(get_db)) -> DbSession:
+    return DbSession(db)
+
+
+async def _async_db_session(session: Any = Depends(get_async_db)) -> DbSession:
+    return DbSession(session)
+
+
+get_db_session = _async_db_session if DB_ASYNC else _sync_db_session
+
+
 def init_db() -> None:
     from app import db_models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def migration_heads() -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(MIGRATIONS_DIR)).get_heads())
+
+
+def check_schema(bind: Engine | None = None, heads: set[str] | None = None) -> None:
+    expected = migration_heads() if heads is None else heads
+    try:
+        with (bind or engine).connect() as conn:
+            current = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except (OperationalError, ProgrammingError) as exc:
+        raise SchemaOutOfDate(f"Database has no Alembic revision; run `alembic upgrade head` ({exc.orig})") from exc
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database is at revision {', '.join(sorted(current)) or 'none'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head`"
+        )
+
+
+def prepare_db() -> None:
+    if DB_STARTUP == "check":
+        check_schema()
+    elif DB_STARTUP == "create_all":
+        init_db()
+    else:
+        raise ValueError(f"Unknown DB_STARTUP mode: {DB_STARTUP!r}")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import DDL, DateTime, Float, Index, Integer, String, Text, UniqueConstraint, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db import Base
@@ -8,7 +8,15 @@ from app.db import Base
 
 class Pan(Base):
     __tablename__ = "pans"
-    __table_args__ = (UniqueConstraint("name", "capacity_label", name="uq_pans_name_capacity"),)
+    __table_args__ = (
+        UniqueConstraint("name", "capacity_label", name="uq_pans_name_capacity"),
+        Index("ix_pans_name_id", "name", "id"),
+        Index("ix_pans_capacity_name_id", "capacity_label", "name", "id"),
+    )
+    # Read server-generated timestamps back in the INSERT/UPDATE itself
+    # (RETURNING), or with a SELECT on dialects without it, so callers never
+    # need ``refresh()``.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -24,3 +32,117 @@ class Pan(Base):
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class WeighIn(Base):
+    """One recorded calculation. Rows are only ever appended."""
+
+    __tablename__ = "weigh_ins"
+    __table_args__ = (
+        Index("ix_weigh_ins_recorded_at", "recorded_at"),
+        Index("ix_weigh_ins_pan_recorded_at", "pan_id", "recorded_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # No foreign key: history outlives deleted pans, and appends skip the check.
+    pan_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # The tare used at the time; the pan's weight may be edited later.
+    pan_weight_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    total_weight_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    total_carbs: Mapped[float] = mapped_column(Float, nullable=False)
+    target_servings: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    target_min_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    target_max_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    net_weight_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    servings: Mapped[int] = mapped_column(Integer, nullable=False)
+    serving_weight_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    carbs_per_serving: Mapped[float] = mapped_column(Float, nullable=False)
+    source: Mapped[str] = mapped_column(String(16), nullable=False)
+    # Set when the calculation ran, not when the buffered row was flushed.
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PanUsage(Base):
+    """How often and how recently each pan was used in a calculation."""
+
+    __tablename__ = "pan_usage"
+    __table_args__ = (Index("ix_pan_usage_last_used_at", "last_used_at"),)
+
+    # Kept apart from ``pans`` so counting uses never touches ``updated_at``
+    # (and with it the catalog validators) or the search index triggers.
+    pan_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    use_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class CatalogRevision(Base):
+    """Single row whose ``revision`` a trigger bumps on every write to ``pans``."""
+
+    __tablename__ = "catalog_revision"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+# SQLite full-text index backing pan search; kept in sync by triggers.
+PAN_SEARCH_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pans_fts USING fts5("
+    "name, capacity_label, content='pans', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_ai AFTER INSERT ON pans BEGIN "
+    "INSERT INTO pans_fts(rowid, name, capacity_label) VALUES (new.id, new.name, new.capacity_label); END",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_ad AFTER DELETE ON pans BEGIN "
+    "INSERT INTO pans_fts(pans_fts, rowid, name, capacity_label) "
+    "VALUES ('delete', old.id, old.name, old.capacity_label); END",
+    "CREATE TRIGGER IF NOT EXISTS pans_fts_au AFTER UPDATE ON pans BEGIN "
+    "INSERT INTO pans_fts(pans_fts, rowid, name, capacity_label) "
+    "VALUES ('delete', old.id, old.name, old.capacity_label); "
+    "INSERT INTO pans_fts(rowid, name, capacity_label) VALUES (new.id, new.name, new.capacity_label); END",
+)
+
+
+
+# On metadata rather than the pans table so create_all also adds the index to
+# databases whose pans table predates it.
+@event.listens_for(Base.metadata, "after_create")
+def _create_pan_search(target, connection, **kw) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    existed = connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'pans_fts'").first()
+    for statement in PAN_SEARCH_SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+    if existed is None:
+        connection.exec_driver_sql("INSERT INTO pans_fts(pans_fts) VALUES ('rebuild')")
+
+
+event.listen(Pan.__table__, "before_drop", DDL("DROP TABLE IF EXISTS pans_fts").execute_if(dialect="sqlite"))
+
+
+# Catalog validators must change on every pan write, including renames in
+# the same second as the previous write, so the database keeps the count.
+CATALOG_REVISION_SQLITE_DDL = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS pans_catalog_revision_{suffix} AFTER {operation} ON pans BEGIN "
+    "UPDATE catalog_revision SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1; END"
+    for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+CATALOG_REVISION_POSTGRES_DDL = (
+    "CREATE OR REPLACE FUNCTION bump_catalog_revision() RETURNS trigger AS $$ BEGIN "
+    "UPDATE catalog_revision SET revision = revision + 1, updated_at = now() WHERE id = 1; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    # after_create fires on every create_all, so replace rather than fail.
+    "DROP TRIGGER IF EXISTS pans_catalog_revision ON pans",
+    "CREATE TRIGGER pans_catalog_revision AFTER INSERT OR UPDATE OR DELETE ON pans "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_revision()",
+)
+
+event.listen(CatalogRevision.__table__, "after_create", DDL("INSERT INTO catalog_revision (id, revision) VALUES (1, 0)"))
+# Both tables must exist before the triggers are created.
+for _statement in CATALOG_REVISION_SQLITE_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in CATALOG_REVISION_POSTGRES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS bump_catalog_revision()").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,178 @@
+"""Buffered, append-only log of weigh-ins.
+
+Routes call ``record_weigh_in``, which only appends to an in-memory buffer.
+A background thread writes the buffer with one executemany when it reaches
+``WEIGH_IN_BATCH_SIZE`` rows, and at least every ``WEIGH_IN_FLUSH_SECONDS``.
+Rows still buffered when a process is killed are lost; that is the price of
+keeping inserts off the request path.
+
+When the write-behind queue (``app/write_behind.py``) is running, rows go
+there instead and share a transaction with the pan usage counters.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.repositories.weigh_ins import insert_weigh_ins
+from app.write_behind import write_behind
+
+logger = logging.getLogger(__name__)
+
+WEIGH_IN_HISTORY = os.getenv("WEIGH_IN_HISTORY", "1") != "0"
+WEIGH_IN_BATCH_SIZE = int(os.getenv("WEIGH_IN_BATCH_SIZE", "500"))
+WEIGH_IN_FLUSH_SECONDS = float(os.getenv("WEIGH_IN_FLUSH_SECONDS", "2"))
+# Rows kept while the database is unavailable; the oldest are dropped past this.
+WEIGH_IN_MAX_PENDING = int(os.getenv("WEIGH_IN_MAX_PENDING", "50000"))
+
+
+class BufferedWriter:
+    """Collects rows in memory and hands them to ``write`` in batches.
+
+    A failed batch is put back and retried on the next flush.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Session, list[dict[str, Any]]], None],
+        batch_size: int = WEIGH_IN_BATCH_SIZE,
+        flush_seconds: float = WEIGH_IN_FLUSH_SECONDS,
+        max_pending: int = WEIGH_IN_MAX_PENDING,
+        enabled: bool = True,
+        session_factory: Callable[[], AbstractContextManager[Session]] = SessionLocal,
+    ) -> None:
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self._pending: deque[dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record(self, row: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = list(self._pending), deque()
+            if not rows:
+                return 0
+            try:
+                with self.session_factory() as db:
+                    self.write(db, rows)
+            except Exception:
+                logger.exception("Failed to write %d buffered rows; will retry", len(rows))
+                with self._lock:
+                    self.failed_flushes += 1
+                    self._pending.extendleft(reversed(rows))
+                    overflow = len(self._pending) - self.max_pending
+                    for _ in range(max(overflow, 0)):
+                        self._pending.popleft()
+                    self.dropped += max(overflow, 0)
+                return 0
+            self.written += len(rows)
+            return len(rows)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="buffered-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher thread after a final flush."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending = deque()
+            self.written = 0
+            self.dropped = 0
+            self.failed_flushes = 0
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None,
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+weigh_in_log = BufferedWriter(insert_weigh_ins, enabled=WEIGH_IN_HISTORY)
+
+
+def record_weigh_in(
+    source: str,
+    pan: Any,
+    total_weight_grams: float,
+    total_carbs: float,
+    target_min_grams: float,
+    target_max_grams: float,
+    target_servings: int | None,
+    plan: tuple[float, int, float, float],
+) -> None:
+    recorded_at = datetime.now(UTC)
+    write_behind.submit("pan_use", (pan.id, recorded_at))
+    if not weigh_in_log.enabled:
+        return
+    net_weight, servings, serving_weight, carbs_per_serving = plan
+    row = {
+        "pan_id": pan.id,
+        "pan_weight_grams": pan.weight_grams,
+        "total_weight_grams": total_weight_grams,
+        "total_carbs": total_carbs,
+        "target_servings": target_servings,
+        "target_min_grams": target_min_grams,
+        "target_max_grams": target_max_grams,
+        "net_weight_grams": net_weight,
+        "servings": servings,
+        "serving_weight_grams": serving_weight,
+        "carbs_per_serving": carbs_per_serving,
+        "source": source,
+        "recorded_at": recorded_at,
+    }
+    if not write_behind.submit("weigh_in", row):
+        weigh_in_log.record(row)
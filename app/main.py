@@ -1,29 +1,80 @@
+from contextlib import asynccontextmanager, contextmanager
+
 from fastapi import Depends, FastAPI
-from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse, RedirectResponse
 
 from app.api.router import api_router
-from app.db import init_db
-from app.db import get_db
+from app.api.responses import FastJSONResponse
+from app.compression import RESPONSE_COMPRESSION, CompressionMiddleware
+from app.db import DbSession, db_pool_stats, get_db, get_db_session, prepare_db
+from app.history import weigh_in_log
+from app.metrics import MetricsMiddleware, render_metrics
 from app.repositories import pans as pans_repo
+from app.repositories.catalog import pan_catalog
 from app.web.router import web_router
-
-app = FastAPI(title="CarbSmart API")
-app.include_router(api_router, prefix="/api")
-app.include_router(web_router)
+from app.web.routes.calc import mini_cache
+from app.web.static import STATIC_URL, AssetFiles, assets
+from app.web.templates import TEMPLATE_MODE, precompile_templates
+from app.write_behind import WRITE_BEHIND, write_behind
 
 
-@app.on_event("startup")
 def startup() -> None:
-    init_db()
+    prepare_db()
+    if TEMPLATE_MODE == "production":
+        precompile_templates()
+
+
+def writer_sessions(app: FastAPI):
+    """Session factory for background writers that honours ``get_db`` overrides."""
+
+    def open_session():
+        return contextmanager(app.dependency_overrides.get(get_db, get_db))()
+
+    return open_session
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup()
+    weigh_in_log.session_factory = write_behind.session_factory = writer_sessions(app)
+    if WRITE_BEHIND:
+        await write_behind.start()
+    elif weigh_in_log.enabled:
+        weigh_in_log.start()
+    yield
+    await write_behind.stop()
+    weigh_in_log.stop()
+    # Requests still in flight once the queue stopped fell back to the buffer,
+    # whose thread never ran in write-behind mode.
+    weigh_in_log.flush()
+
+
+app = FastAPI(title="CarbSmart API", lifespan=lifespan)
+app.include_router(api_router, prefix="/api")
+app.include_router(web_router)
+app.mount(STATIC_URL, AssetFiles(assets), name="static")
+if RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
-def root(db: Session = Depends(get_db)) -> RedirectResponse:
-    pans = pans_repo.list_pans(db)
-    target = "/calc" if pans else "/pans"
+async def root(db: DbSession = Depends(get_db_session)) -> RedirectResponse:
+    target = "/calc" if await db.run(pans_repo.has_pans) else "/pans"
     return RedirectResponse(url=target, status_code=303)
 
-@app.get("/health")
+@app.get("/health", response_class=FastJSONResponse)
 def health() -> dict:
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "pan_cache": pan_catalog.stats(),
+        "mini_cache": mini_cache.stats(),
+        "db_pools": db_pool_stats(),
+        "weigh_in_log": weigh_in_log.stats(),
+        "write_behind": write_behind.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
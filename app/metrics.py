@@ -0,0 +1,248 @@
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (plus +Inf), then sum.
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self) -> dict[tuple[str, ...], tuple[list[int], float]]:
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels({**base, 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback when metrics are rendered."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._read: Callable[[], float] = lambda: 0.0
+
+    def set_function(self, read: Callable[[], float]) -> None:
+        self._read = read
+
+    def value(self) -> float:
+        return float(self._read())
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value()!r}"]
+
+
+request_seconds = Histogram(
+    "carbsmart_http_request_duration_seconds",
+    "Request latency by route.",
+    ("method", "route", "status"),
+)
+request_db_queries = Histogram(
+    "carbsmart_http_request_db_queries",
+    "Database queries issued per request.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "carbsmart_http_request_db_seconds",
+    "Time spent in database queries per request.",
+    ("method", "route"),
+)
+db_query_seconds = Histogram(
+    "carbsmart_db_query_duration_seconds",
+    "Duration of individual database queries.",
+)
+template_render_seconds = Histogram(
+    "carbsmart_template_render_seconds",
+    "Jinja template render time.",
+    ("template",),
+)
+template_load_seconds = Histogram(
+    "carbsmart_template_load_seconds",
+    "Jinja template load time (compile, or read from the bytecode cache).",
+    ("template",),
+)
+calculate_plan_seconds = Histogram(
+    "carbsmart_calculate_plan_seconds",
+    "Time spent in calculate_plan.",
+    buckets=FAST_BUCKETS,
+)
+
+write_behind_flush_seconds = Histogram(
+    "carbsmart_write_behind_flush_seconds",
+    "Time to write one write-behind batch, including the commit.",
+)
+write_behind_batch_ops = Histogram(
+    "carbsmart_write_behind_batch_ops",
+    "Queued writes coalesced into each write-behind batch.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+write_behind_queue_depth = Gauge(
+    "carbsmart_write_behind_queue_depth",
+    "Writes waiting in the write-behind queue.",
+)
+
+HISTOGRAMS = (
+    request_seconds,
+    request_db_queries,
+    request_db_seconds,
+    db_query_seconds,
+    template_render_seconds,
+    template_load_seconds,
+    calculate_plan_seconds,
+    write_behind_flush_seconds,
+    write_behind_batch_ops,
+)
+GAUGES = (write_behind_queue_depth,)
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in (*HISTOGRAMS, *GAUGES):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request. Threadpool calls
+# and run_sync inherit the context, so queries land on the right request.
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_seconds.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def _route_label(scope) -> str:
+    # Label by the matched route's template so labels stay bounded. Routes on
+    # an included router only carry their own path; FastAPI keeps the full,
+    # prefixed one on the effective route context.
+    if "route" not in scope:
+        # Mounted apps such as /static only leave their mount point behind.
+        mount = scope.get("root_path", "").removeprefix(scope.get("app_root_path", ""))
+        return f"{mount}/{{path}}" if mount else "unmatched"
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path", "") or scope["route"].path
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records latency and DB usage per route."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = _route_label(scope)
+            method = scope["method"]
+            request_seconds.observe(elapsed, method, route, str(status))
+            request_db_queries.observe(stats.queries, method, route)
+            request_db_seconds.observe(stats.db_seconds, method, route)
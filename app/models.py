@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -41,3 +43,54 @@ class CalcResponse(BaseModel):
     servings: int
     serving_weight_grams: float
     carbs_per_serving: float
+
+
+class CalcBatchItem(BaseModel):
+    status_code: int
+    result: CalcResponse | None = None
+    error: str | None = None
+
+
+class CalcBatchResponse(BaseModel):
+    items: list[CalcBatchItem]
+
+
+class PanImportIssue(BaseModel):
+    line: int
+    name: str | None = None
+    capacity_label: str | None = None
+    error: str
+
+
+class PanImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    issues: list[PanImportIssue] = []
+    issues_truncated: bool = False
+
+
+class WeighIn(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    pan_id: int
+    pan_weight_grams: float
+    total_weight_grams: float
+    total_carbs: float
+    target_servings: int | None = None
+    target_min_grams: float
+    target_max_grams: float
+    net_weight_grams: float
+    servings: int
+    serving_weight_grams: float
+    carbs_per_serving: float
+    source: str
+    recorded_at: datetime
+
+
+class PanUsage(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    pan_id: int
+    use_count: int
+    last_used_at: datetime
@@ -0,0 +1,161 @@
+"""In-process cache of the pan catalog.
+
+Pans change a few times a week but are read on every calculator hit, so
+reads are served from an immutable snapshot. The repository write
+functions bump ``version`` to drop the snapshot; the TTL bounds staleness
+for writes made by other worker processes.
+"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db_models import Pan
+
+PAN_CACHE_TTL_SECONDS = float(os.getenv("PAN_CACHE_TTL_SECONDS", "30"))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPan:
+    id: int
+    name: str
+    weight_grams: float
+    capacity_label: str
+    notes: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    @classmethod
+    def from_orm(cls, pan: Pan) -> "CachedPan":
+        return cls(
+            id=pan.id,
+            name=pan.name,
+            weight_grams=pan.weight_grams,
+            capacity_label=pan.capacity_label,
+            notes=pan.notes,
+            created_at=pan.created_at,
+            updated_at=pan.updated_at,
+        )
+
+
+@dataclass(slots=True)
+class _Snapshot:
+    version: int
+    loaded_at: float
+    pans: tuple[CachedPan, ...]
+    by_id: dict[int, CachedPan]
+    derived: dict[str, Any] = field(default_factory=dict)
+
+
+class PanCatalog:
+    def __init__(self, ttl_seconds: float = PAN_CACHE_TTL_SECONDS) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._snapshot: _Snapshot | None = None
+        self._memo: dict[str, tuple[int, float, Any]] = {}
+        self._listeners: list[Callable[[int | None], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[int | None], None]) -> None:
+        """Call ``listener(pan_id)`` after every invalidation (``None`` means all pans)."""
+        self._listeners.append(listener)
+
+    def invalidate(self, pan_id: int | None = None) -> None:
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+            self._memo.clear()
+        for listener in self._listeners:
+            listener(pan_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+            self._memo.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float | int]:
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(snapshot.pans) if snapshot else 0,
+        }
+
+    def _fresh(self, version: int, loaded_at: float) -> bool:
+        return version == self.version and time.monotonic() - loaded_at < self.ttl_seconds
+
+    def _current(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and self._fresh(snapshot.version, snapshot.loaded_at):
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        # Read the version before querying so a write that lands mid-load
+        # leaves the stale snapshot unpublished.
+        version = self.version
+        pans = tuple(
+            CachedPan.from_orm(pan) for pan in db.execute(select(Pan).order_by(Pan.name)).scalars()
+        )
+        snapshot = _Snapshot(version, time.monotonic(), pans, {pan.id: pan for pan in pans})
+        with self._lock:
+            if version == self.version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def list_pans(self, db: Session) -> list[CachedPan]:
+        return list(self._current(db).pans)
+
+    def get_pan(self, db: Session, pan_id: int) -> CachedPan | None:
+        pan = self._current(db).by_id.get(pan_id)
+        if pan is not None:
+            return pan
+        # Possibly created by another worker since the snapshot was taken.
+        row = db.get(Pan, pan_id)
+        if row is None:
+            return None
+        self.invalidate(pan_id)
+        return CachedPan.from_orm(row)
+
+    def derived(self, db: Session, key: str, build: Callable[[tuple[CachedPan, ...]], Any]) -> Any:
+        """Return ``build(pans)`` memoized for the current catalog version."""
+        snapshot = self._current(db)
+        if key not in snapshot.derived:
+            snapshot.derived[key] = build(snapshot.pans)
+        return snapshot.derived[key]
+
+    def memo(self, db: Session, key: str, load: Callable[[Session], Any]) -> Any:
+        """Return ``load(db)`` memoized for the current catalog version.
+
+        Unlike ``derived`` this does not load the full snapshot, so it suits
+        cheap aggregate queries such as existence checks.
+        """
+        cached = self._memo.get(key)
+        if cached is not None and self._fresh(cached[0], cached[1]):
+            self.hits += 1
+            return cached[2]
+
+        self.misses += 1
+        version = self.version
+        value = load(db)
+        with self._lock:
+            if version == self.version:
+                self._memo[key] = (version, time.monotonic(), value)
+        return value
+
+
+pan_catalog = PanCatalog()
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db import upsert_insert
+from app.db_models import Pan, PanUsage
+
+
+def add_pan_usage(db: Session, uses: dict[int, tuple[int, datetime]]) -> None:
+    """Add ``count`` uses to each pan in ``{pan_id: (count, last_used_at)}`` without committing."""
+    if not uses:
+        return
+    values = [{"pan_id": pan_id, "use_count": count, "last_used_at": at} for pan_id, (count, at) in uses.items()]
+    table = PanUsage.__table__
+    stmt = upsert_insert(db, table)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.pan_id],
+            set_={
+                "use_count": table.c.use_count + stmt.excluded.use_count,
+                "last_used_at": case(
+                    (stmt.excluded.last_used_at > table.c.last_used_at, stmt.excluded.last_used_at),
+                    else_=table.c.last_used_at,
+                ),
+            },
+        )
+        db.connection().execute(stmt, values)
+        return
+
+    existing = set(db.scalars(select(table.c.pan_id).where(table.c.pan_id.in_(uses))))
+    new = [value for value in values if value["pan_id"] not in existing]
+    if new:
+        db.connection().execute(insert(table), new)
+    if existing:
+        at = bindparam("at", type_=table.c.last_used_at.type)
+        db.connection().execute(
+            update(table)
+            .where(table.c.pan_id == bindparam("key_pan_id"))
+            .values(
+                use_count=table.c.use_count + bindparam("added"),
+                last_used_at=case(
+                    (at > table.c.last_used_at, at),
+                    else_=table.c.last_used_at,
+                ),
+            ),
+            [
+                {"key_pan_id": value["pan_id"], "added": value["use_count"], "at": value["last_used_at"]}
+                for value in values
+                if value["pan_id"] in existing
+            ],
+        )
+
+
+def list_recent_usage(db: Session, limit: int) -> list[PanUsage]:
+    """Most recently used pans first; usage of deleted pans is left out."""
+    query = (
+        select(PanUsage)
+        .join(Pan, Pan.id == PanUsage.pan_id)
+        .order_by(PanUsage.last_used_at.desc())
+        .limit(limit)
+    )
+    return list(db.scalars(query))
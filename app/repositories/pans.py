@@ -1,18 +1,119 @@
-from sqlalchemy import select
+import re
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select, text, tuple_, update
 from sqlalchemy.orm import Session
 
-from app.db_models import Pan
+from app.db import upsert_insert
+from app.db_models import CatalogRevision, Pan
 from app.models import PanCreate, PanUpdate
+from app.repositories.catalog import pan_catalog
 
 
 def list_pans(db: Session) -> list[Pan]:
     return list(db.execute(select(Pan).order_by(Pan.name)).scalars().all())
 
 
+def list_pans_page(
+    db: Session,
+    limit: int,
+    after: tuple[str, int] | None = None,
+    name_prefix: str | None = None,
+    capacity_label: str | None = None,
+) -> tuple[list[Pan], tuple[str, int] | None]:
+    """Return up to ``limit`` pans ordered by ``(name, id)`` after the ``after`` key.
+
+    The second element is the key to pass as ``after`` for the next page, or
+    None on the last page. ``name_prefix`` is case-sensitive so the
+    ``(name, id)`` index serves it as a range scan.
+    """
+    query = select(Pan).order_by(Pan.name, Pan.id).limit(limit + 1)
+    if name_prefix:
+        query = query.where(Pan.name >= name_prefix, Pan.name < name_prefix + "\U0010ffff")
+    if capacity_label is not None:
+        query = query.where(Pan.capacity_label == capacity_label)
+    if after is not None:
+        query = query.where(tuple_(Pan.name, Pan.id) > tuple_(*after))
+
+    pans = list(db.execute(query).scalars())
+    if len(pans) <= limit:
+        return pans, None
+    pans = pans[:limit]
+    return pans, (pans[-1].name, pans[-1].id)
+
+
+_SQLITE_SEARCH = text(
+    "SELECT pans.* FROM pans JOIN pans_fts ON pans_fts.rowid = pans.id "
+    "WHERE pans_fts MATCH :match ORDER BY pans_fts.rank, pans.name LIMIT :limit"
+)
+
+
+def search_pans(db: Session, query: str, limit: int) -> list[Pan]:
+    """Return up to ``limit`` pans matching every word of ``query`` as a prefix.
+
+    SQLite uses the ``pans_fts`` full-text index ranked by relevance; other
+    dialects fall back to a case-insensitive substring match ordered by name,
+    which Postgres answers from trigram indexes on both columns.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return []
+
+    if db.get_bind().dialect.name == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        statement = select(Pan).from_statement(_SQLITE_SEARCH)
+        return list(db.execute(statement, {"match": match, "limit": limit}).scalars())
+
+    conditions = [
+        or_(Pan.name.icontains(term, autoescape=True), Pan.capacity_label.icontains(term, autoescape=True))
+        for term in terms
+    ]
+    statement = select(Pan).where(and_(*conditions)).order_by(Pan.name, Pan.id).limit(limit)
+    return list(db.execute(statement).scalars())
+
+
+def _query_has_pans(db: Session) -> bool:
+    return db.execute(select(Pan.id).limit(1)).first() is not None
+
+
+def _query_count_pans(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(Pan)).scalar_one()
+
+
+def catalog_fingerprint(db: Session) -> tuple[int, datetime | None]:
+    """Return ``(revision, last changed)`` for the catalog.
+
+    Triggers bump the revision on every write to ``pans``, including raw SQL
+    and other workers, so it is read fresh on each call: one primary-key
+    lookup, deliberately not memoized like the catalog snapshot.
+    """
+    revision, updated_at = db.execute(
+        select(CatalogRevision.revision, CatalogRevision.updated_at).where(CatalogRevision.id == 1)
+    ).one()
+    return revision, updated_at
+
+
+def has_pans(db: Session) -> bool:
+    return pan_catalog.memo(db, "has_pans", _query_has_pans)
+
+
+def count_pans(db: Session) -> int:
+    return pan_catalog.memo(db, "count_pans", _query_count_pans)
+
+
 def get_pan(db: Session, pan_id: int) -> Pan | None:
     return db.get(Pan, pan_id)
 
 
+def get_pans_by_ids(db: Session, pan_ids: Iterable[int]) -> dict[int, Pan]:
+    ids = set(pan_ids)
+    if not ids:
+        return {}
+    pans = db.execute(select(Pan).where(Pan.id.in_(ids))).scalars().all()
+    return {pan.id: pan for pan in pans}
+
+
 def create_pan(db: Session, payload: PanCreate) -> Pan:
     pan = Pan(
         name=payload.name,
@@ -22,22 +123,102 @@ def create_pan(db: Session, payload: PanCreate) -> Pan:
     )
     db.add(pan)
     db.commit()
-    db.refresh(pan)
+    pan_catalog.invalidate()
     return pan
 
 
-def update_pan(db: Session, pan: Pan, payload: PanUpdate) -> Pan:
+def update_pan(db: Session, pan_id: int, payload: PanUpdate) -> Pan | None:
+    """Apply ``payload`` with one ``UPDATE ... WHERE id = ? RETURNING``.
+
+    Returns None when no pan has ``pan_id``. Raises ``IntegrityError`` when
+    the new name and capacity clash with another pan.
+    """
     updates = payload.model_dump(exclude_unset=True)
     if "capacity_label" in updates and updates["capacity_label"] is None:
         updates["capacity_label"] = ""
-    for key, value in updates.items():
-        setattr(pan, key, value)
+    if not updates:
+        return get_pan(db, pan_id)
 
+    stmt = update(Pan).where(Pan.id == pan_id).values(**updates)
+    if db.get_bind(clause=stmt).dialect.update_returning:
+        pan = db.execute(stmt.returning(Pan)).scalar_one_or_none()
+    else:
+        pan = get_pan(db, pan_id) if db.execute(stmt).rowcount else None
     db.commit()
-    db.refresh(pan)
+    if pan is not None:
+        pan_catalog.invalidate(pan_id)
     return pan
 
 
-def delete_pan(db: Session, pan: Pan) -> None:
-    db.delete(pan)
+def delete_pan(db: Session, pan_id: int) -> bool:
+    """Delete with one ``DELETE ... WHERE id = ?``; returns False when there was no such pan."""
+    deleted = db.execute(delete(Pan).where(Pan.id == pan_id)).rowcount
     db.commit()
+    if deleted:
+        pan_catalog.invalidate(pan_id)
+    return bool(deleted)
+
+
+def upsert_pans(db: Session, pans: list[PanCreate], on_conflict: str = "update") -> set[tuple[str, str]]:
+    """Insert ``pans`` in one executemany, upserting on ``(name, capacity_label)``.
+
+    With ``on_conflict="update"`` existing pans take the new weight, and the
+    new notes when given; with ``"skip"`` they are left alone. Returns the keys that already existed.
+    Callers must not pass the same key twice in one call.
+    """
+    if not pans:
+        return set()
+    values = [
+        {"name": pan.name, "weight_grams": pan.weight_grams, "capacity_label": pan.capacity_label or "", "notes": pan.notes}
+        for pan in pans
+    ]
+    keys = [(value["name"], value["capacity_label"]) for value in values]
+    existing = {
+        (row.name, row.capacity_label)
+        for row in db.execute(select(Pan.name, Pan.capacity_label).where(tuple_(Pan.name, Pan.capacity_label).in_(keys)))
+    }
+
+    stmt = upsert_insert(db, Pan)
+    if stmt is not None:
+        if on_conflict == "update":
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Pan.name, Pan.capacity_label],
+                set_={
+                    "weight_grams": stmt.excluded.weight_grams,
+                    "notes": func.coalesce(stmt.excluded.notes, Pan.notes),
+                    "updated_at": func.now(),
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Pan.name, Pan.capacity_label])
+        db.execute(stmt, values)
+    else:
+        new = [value for value, key in zip(values, keys) if key not in existing]
+        if new:
+            db.execute(insert(Pan), new)
+        if on_conflict == "update" and len(new) < len(values):
+            table = Pan.__table__
+            db.connection().execute(
+                update(table)
+                .where(table.c.name == bindparam("key_name"), table.c.capacity_label == bindparam("key_capacity"))
+                .values(
+                    weight_grams=bindparam("new_weight"),
+                    notes=func.coalesce(bindparam("new_notes", type_=table.c.notes.type), table.c.notes),
+                    updated_at=func.now(),
+                ),
+                [
+                    {"key_name": key[0], "key_capacity": key[1], "new_weight": value["weight_grams"], "new_notes": value["notes"]}
+                    for value, key in zip(values, keys)
+                    if key in existing
+                ],
+            )
+
+    db.commit()
+    # The statements above bypass the identity map; drop any loaded pans.
+    db.expire_all()
+    pan_catalog.invalidate()
+    return existing
+
+
+def export_statement():
+    return select(Pan).order_by(Pan.id)
@@ -0,0 +1,40 @@
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db_models import WeighIn
+
+
+def add_weigh_ins(db: Session, rows: list[dict[str, Any]]) -> None:
+    """Queue ``rows`` in the current transaction without committing."""
+    db.execute(insert(WeighIn), rows)
+
+
+def insert_weigh_ins(db: Session, rows: list[dict[str, Any]]) -> None:
+    add_weigh_ins(db, rows)
+    db.commit()
+
+
+def _utc(value: datetime) -> datetime:
+    # Rows are recorded in UTC; naive bounds are taken to be UTC too.
+    return value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def list_weigh_ins(
+    db: Session,
+    limit: int,
+    pan_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[WeighIn]:
+    """Return the newest weigh-ins first, optionally for one pan and a ``[since, until)`` window."""
+    query = select(WeighIn).order_by(WeighIn.recorded_at.desc()).limit(limit)
+    if pan_id is not None:
+        query = query.where(WeighIn.pan_id == pan_id)
+    if since is not None:
+        query = query.where(WeighIn.recorded_at >= _utc(since))
+    if until is not None:
+        query = query.where(WeighIn.recorded_at < _utc(until))
+    return list(db.execute(query).scalars())
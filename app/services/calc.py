@@ -1,21 +1,41 @@
 import math
 
+# Below this many serving counts ranking all of them is cheaper than solving.
+_SMALL_SCAN = 16
 
-def choose_servings(net_weight_grams: float, target_min_grams: float, target_max_grams: float) -> tuple[int, float]:
-    if net_weight_grams <= 0:
-        raise ValueError("Net weight must be positive")
-    if target_min_grams <= 0 or target_max_grams <= 0:
-        raise ValueError("Target range must be positive")
-    if target_min_grams > target_max_grams:
-        raise ValueError("Target min must be <= target max")
 
-    max_servings = max(1, math.ceil(net_weight_grams / target_min_grams))
+def _first_at_most(net_weight_grams: float, limit: float, max_servings: int) -> int:
+    # Smallest serving count whose serving weight is <= limit (max_servings + 1 if none).
+    servings = min(max(1, math.ceil(net_weight_grams / limit)), max_servings + 1)
+    while servings <= max_servings and net_weight_grams / servings > limit:
+        servings += 1
+    while servings > 1 and net_weight_grams / (servings - 1) <= limit:
+        servings -= 1
+    return servings
+
+
+def _last_at_least(net_weight_grams: float, limit: float, max_servings: int) -> int:
+    # Largest serving count whose serving weight is >= limit (0 if none).
+    servings = min(math.floor(net_weight_grams / limit), max_servings)
+    while servings >= 1 and net_weight_grams / servings < limit:
+        servings -= 1
+    while servings < max_servings and net_weight_grams / (servings + 1) >= limit:
+        servings += 1
+    return servings
+
+
+def _rank_servings(
+    net_weight_grams: float,
+    target_min_grams: float,
+    target_max_grams: float,
+    candidates,
+) -> tuple[int, float]:
     midpoint = (target_min_grams + target_max_grams) / 2
 
     in_range: list[tuple[float, int, float]] = []
     out_range: list[tuple[float, float, int, float]] = []
 
-    for servings in range(1, max_servings + 1):
+    for servings in candidates:
         serving_weight = net_weight_grams / servings
         if target_min_grams <= serving_weight <= target_max_grams:
             in_range.append((abs(serving_weight - midpoint), servings, serving_weight))
@@ -34,6 +54,47 @@ def choose_servings(net_weight_grams: float, target_min_grams: float, target_max
     return servings, serving_weight
 
 
+def _validate_targets(net_weight_grams: float, target_min_grams: float, target_max_grams: float) -> None:
+    if net_weight_grams <= 0:
+        raise ValueError("Net weight must be positive")
+    if target_min_grams <= 0 or target_max_grams <= 0:
+        raise ValueError("Target range must be positive")
+    if target_min_grams > target_max_grams:
+        raise ValueError("Target min must be <= target max")
+
+
+def choose_servings(net_weight_grams: float, target_min_grams: float, target_max_grams: float) -> tuple[int, float]:
+    _validate_targets(net_weight_grams, target_min_grams, target_max_grams)
+
+    max_servings = max(1, math.ceil(net_weight_grams / target_min_grams))
+    if max_servings <= _SMALL_SCAN:
+        return _rank_servings(net_weight_grams, target_min_grams, target_max_grams, range(1, max_servings + 1))
+
+    # Serving weight falls as the serving count grows, so the in-range counts
+    # form one contiguous run [first_in, last_in] and the distance to the
+    # midpoint is smallest where the weight crosses it. Only the counts around
+    # those boundaries can win, so rank just those instead of every count.
+    first_in = _first_at_most(net_weight_grams, target_max_grams, max_servings)
+    last_in = _last_at_least(net_weight_grams, target_min_grams, max_servings)
+    around_midpoint = math.floor(net_weight_grams / ((target_min_grams + target_max_grams) / 2))
+
+    candidates = {1, max_servings}
+    for base in (first_in, last_in, around_midpoint):
+        candidates.update(range(max(1, base - 2), min(max_servings, base + 2) + 1))
+
+    return _rank_servings(net_weight_grams, target_min_grams, target_max_grams, candidates)
+
+
+def _choose_servings_linear(
+    net_weight_grams: float, target_min_grams: float, target_max_grams: float
+) -> tuple[int, float]:
+    # Reference implementation that ranks every serving count. Kept for the
+    # equivalence tests and benchmarks of choose_servings.
+    _validate_targets(net_weight_grams, target_min_grams, target_max_grams)
+    max_servings = max(1, math.ceil(net_weight_grams / target_min_grams))
+    return _rank_servings(net_weight_grams, target_min_grams, target_max_grams, range(1, max_servings + 1))
+
+
 def calculate_plan(
     total_weight_grams: float,
     pan_weight_grams: float,
@@ -0,0 +1,126 @@
+"""Array versions of the serving calculations for bulk reconciliation.
+
+Requires NumPy (``pip install carbsmart[reconcile]``). Results match
+``app.services.calc.calculate_plan`` row for row; rows the scalar version
+would reject with ``ValueError`` are flagged in the returned ``ok`` mask
+instead of raising.
+"""
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# Rows per chunk; keeps the (rows x candidates) scratch arrays small.
+_CHUNK_ROWS = 65_536
+
+
+def _first_at_most(net: NDArray, limit: NDArray, max_servings: NDArray) -> NDArray:
+    servings = np.minimum(np.maximum(1.0, np.ceil(net / limit)), max_servings + 1)
+    for _ in range(2):
+        servings = np.where((servings <= max_servings) & (net / servings > limit), servings + 1, servings)
+    for _ in range(2):
+        prev = np.maximum(servings - 1, 1.0)
+        servings = np.where((servings > 1) & (net / prev <= limit), servings - 1, servings)
+    return servings
+
+
+def _last_at_least(net: NDArray, limit: NDArray, max_servings: NDArray) -> NDArray:
+    servings = np.minimum(np.floor(net / limit), max_servings)
+    for _ in range(2):
+        current = np.maximum(servings, 1.0)
+        servings = np.where((servings >= 1) & (net / current < limit), servings - 1, servings)
+    for _ in range(2):
+        servings = np.where((servings < max_servings) & (net / (servings + 1) >= limit), servings + 1, servings)
+    return servings
+
+
+def _choose_servings(net: NDArray, lo: NDArray, hi: NDArray) -> tuple[NDArray, NDArray]:
+    max_servings = np.maximum(1.0, np.ceil(net / lo))
+    midpoint = (lo + hi) / 2
+
+    # In-range counts are the run [first_in, last_in]; within it the best
+    # count sits on either side of the midpoint crossing. Outside it only the
+    # neighbours of the run can win.
+    first_in = _first_at_most(net, hi, max_servings)
+    last_in = _last_at_least(net, lo, max_servings)
+    crossing = np.clip(_first_at_most(net, midpoint, max_servings), first_in, np.maximum(last_in, first_in))
+    candidates = np.stack([crossing - 1, crossing, first_in - 1, last_in + 1], axis=1)
+    usable = (candidates >= 1) & (candidates <= max_servings[:, None])
+    candidates = np.where(usable, candidates, 1.0)
+
+    weights = net[:, None] / candidates
+    below = weights < lo[:, None]
+    above = weights > hi[:, None]
+    distance = np.where(below, lo[:, None] - weights, np.where(above, weights - hi[:, None], 0.0))
+    keys = (
+        (below | above).astype(np.float64),
+        distance,
+        np.abs(weights - midpoint[:, None]),
+        candidates,
+    )
+
+    # Same ordering as the scalar ranking: in range first, then distance to
+    # the range, distance to the midpoint and finally the smaller count.
+    keep = usable
+    for key in keys:
+        masked = np.where(keep, key, np.inf)
+        keep = keep & (masked == masked.min(axis=1, keepdims=True))
+
+    rows = np.arange(len(net))
+    pick = keep.argmax(axis=1)
+    return candidates[rows, pick], weights[rows, pick]
+
+
+def calculate_plans(
+    total_weight_grams: ArrayLike,
+    pan_weight_grams: ArrayLike,
+    total_carbs: ArrayLike,
+    target_min_grams: ArrayLike,
+    target_max_grams: ArrayLike,
+    target_servings: ArrayLike | None = None,
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+    """Vectorized ``calculate_plan``.
+
+    Inputs broadcast against each other. Non-positive ``target_servings``
+    entries mean "no forced count" (the scalar ``None``). Returns
+    ``(net_weight, servings, serving_weight, carbs_per_serving, ok)``;
+    rows where ``ok`` is False hold NaN and 0 servings.
+    """
+    arrays = np.broadcast_arrays(
+        np.asarray(total_weight_grams, dtype=np.float64),
+        np.asarray(pan_weight_grams, dtype=np.float64),
+        np.asarray(total_carbs, dtype=np.float64),
+        np.asarray(target_min_grams, dtype=np.float64),
+        np.asarray(target_max_grams, dtype=np.float64),
+        np.asarray(0 if target_servings is None else target_servings, dtype=np.int64),
+    )
+    total, pan, carbs, lo, hi, forced = (np.ravel(a) for a in arrays)
+    shape = arrays[0].shape
+
+    net = total - pan
+    forced_rows = forced > 0
+    ok = (net > 0) & (forced_rows | ((lo > 0) & (hi > 0) & (lo <= hi)))
+    ranged = ok & ~forced_rows
+
+    servings = np.zeros(net.shape, dtype=np.float64)
+    serving_weight = np.full(net.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        servings[forced_rows] = forced[forced_rows]
+        serving_weight[forced_rows] = net[forced_rows] / servings[forced_rows]
+
+        (ranged_idx,) = np.nonzero(ranged)
+        for start in range(0, len(ranged_idx), _CHUNK_ROWS):
+            idx = ranged_idx[start : start + _CHUNK_ROWS]
+            servings[idx], serving_weight[idx] = _choose_servings(net[idx], lo[idx], hi[idx])
+
+        carbs_per_serving = np.where(ok, carbs / np.where(ok, servings, 1.0), np.nan)
+
+    servings[~ok] = 0
+    serving_weight[~ok] = np.nan
+    net = np.where(ok, net, np.nan)
+    return (
+        net.reshape(shape),
+        servings.astype(np.int64).reshape(shape),
+        serving_weight.reshape(shape),
+        carbs_per_serving.reshape(shape),
+        ok.reshape(shape),
+    )
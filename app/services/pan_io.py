@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.db_models import Pan
+from app.models import PanCreate, PanImportIssue, PanImportResult
+from app.repositories import pans as pans_repo
+from app.serialization import dumps
+
+FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 1000
+# Past this many the import keeps counting but stops listing rows.
+MAX_IMPORT_ISSUES = 1000
+EXPORT_COLUMNS = ("id", "name", "weight_grams", "capacity_label", "notes", "created_at", "updated_at")
+
+
+class PanImportError(ValueError):
+    pass
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+def _csv_rows(stream: IO[str]) -> Iterator[tuple[int, dict[str, Any]]]:
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        return
+    missing = {"name", "weight_grams"} - set(reader.fieldnames)
+    if missing:
+        raise PanImportError(f"CSV header is missing {', '.join(sorted(missing))}")
+    for row in reader:
+        row.pop(None, None)
+        # Empty cells mean "not given" so exported files import back unchanged.
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def _ndjson_rows(stream: IO[str]) -> Iterator[tuple[int, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, PanImportError(f"invalid JSON: {exc.msg}")
+
+
+def parse_pans(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict[str, Any] | None, PanCreate | str]]:
+    """Yield ``(line, raw row, PanCreate or error message)`` for each record in ``stream``."""
+    rows = _csv_rows(stream) if fmt == "csv" else _ndjson_rows(stream)
+    for line, row in rows:
+        if isinstance(row, PanImportError):
+            yield line, None, str(row)
+        elif not isinstance(row, dict):
+            yield line, None, "expected a JSON object"
+        else:
+            try:
+                yield line, row, PanCreate.model_validate(row)
+            except ValidationError as exc:
+                yield line, row, _validation_message(exc)
+
+
+def import_pans(
+    db: Session,
+    stream: IO[str],
+    fmt: str,
+    on_conflict: str = "update",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> PanImportResult:
+    """Upsert every pan in ``stream`` in chunks of ``chunk_size`` rows.
+
+    Each chunk is one executemany and one commit, so memory stays flat and a
+    failure part way through keeps the chunks already written. A key that
+    repeats inside a chunk keeps the last row with ``on_conflict="update"``
+    and the first with ``"skip"``.
+    """
+    result = PanImportResult()
+
+    def report(line: int, error: str, name: Any = None, capacity_label: Any = None) -> None:
+        if len(result.issues) >= MAX_IMPORT_ISSUES:
+            result.issues_truncated = True
+            return
+        result.issues.append(
+            PanImportIssue(
+                line=line,
+                name=name if isinstance(name, str) else None,
+                capacity_label=capacity_label if isinstance(capacity_label, str) else None,
+                error=error,
+            )
+        )
+
+    chunk: dict[tuple[str, str], tuple[int, PanCreate]] = {}
+
+    def flush() -> None:
+        existing = pans_repo.upsert_pans(db, [pan for _, pan in chunk.values()], on_conflict)
+        for key, (line, _) in chunk.items():
+            if key not in existing:
+                result.created += 1
+            elif on_conflict == "update":
+                result.updated += 1
+            else:
+                result.skipped += 1
+                report(line, "pan already exists", *key)
+        chunk.clear()
+
+    for line, row, pan in parse_pans(stream, fmt):
+        if isinstance(pan, str):
+            result.failed += 1
+            report(line, pan, *((row.get("name"), row.get("capacity_label")) if row else ()))
+            continue
+        key = (pan.name, pan.capacity_label or "")
+        if key in chunk:
+            result.skipped += 1
+            if on_conflict == "update":
+                earlier = chunk.pop(key)[0]
+                report(earlier, f"superseded by line {line}", *key)
+            else:
+                report(line, f"duplicate of line {chunk[key][0]}", *key)
+                continue
+        chunk[key] = (line, pan)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return result
+
+
+def _export_row(pan: Pan) -> dict[str, Any]:
+    return {
+        "id": pan.id,
+        "name": pan.name,
+        "weight_grams": pan.weight_grams,
+        "capacity_label": pan.capacity_label,
+        "notes": pan.notes,
+        "created_at": pan.created_at.isoformat() if pan.created_at else None,
+        "updated_at": pan.updated_at.isoformat() if pan.updated_at else None,
+    }
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def csv_chunk(pans: Iterable[Pan]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS)
+    writer.writerows(_export_row(pan) for pan in pans)
+    return buffer.getvalue().encode()
+
+
+def ndjson_chunk(pans: Iterable[Pan]) -> bytes:
+    return b"".join(dumps(_export_row(pan)) + b"\n" for pan in pans)
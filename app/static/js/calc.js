@@ -0,0 +1,45 @@
+(() => {
+  // Greys out the serving range while an explicit serving count is set.
+  const ts = document.getElementById("targetServings");
+  const rg = document.getElementById("servingRangeGroup");
+  const mn = document.getElementById("targetMin");
+  const mx = document.getElementById("targetMax");
+  if (!ts || !rg || !mn || !mx) return;
+  function sync() {
+    const hasTarget = ts.value.trim() !== "";
+    rg.style.opacity = hasTarget ? "0.45" : "1";
+    mn.disabled = hasTarget;
+    mx.disabled = hasTarget;
+  }
+  ts.addEventListener("input", sync);
+  sync();
+})();
+
+(() => {
+  // Typeahead for catalogs too large to inline in the pan dropdown.
+  const input = document.getElementById("panSearch");
+  const select = document.getElementById("panSelect");
+  if (!input || !select) return;
+  const label = (pan) => {
+    let text = pan.name;
+    if (pan.capacity_label) text += ` (${pan.capacity_label})`;
+    return `${text} - ${pan.weight_grams.toFixed(0)} g`;
+  };
+  let timer = null;
+  let seq = 0;
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const q = input.value.trim();
+    if (!q) return;
+    timer = setTimeout(async () => {
+      const current = ++seq;
+      const resp = await fetch(`/api/pans/search?${new URLSearchParams({ q, limit: "20" })}`);
+      if (!resp.ok || current !== seq) return;
+      const pans = await resp.json();
+      select.replaceChildren(
+        ...pans.map((pan) => new Option(label(pan), pan.id)),
+      );
+      if (!pans.length) select.append(new Option("No matching pans", ""));
+    }, 150);
+  });
+})();
@@ -0,0 +1,12 @@
+(() => {
+  const btn = document.getElementById("copyShareLink");
+  if (!btn) return;
+  const label = btn.textContent;
+  btn.addEventListener("click", () => {
+    const url = new URL(btn.dataset.url, window.location.origin);
+    navigator.clipboard.writeText(url.href).then(() => {
+      btn.textContent = "Copied!";
+      setTimeout(() => { btn.textContent = label; }, 2000);
+    });
+  });
+})();
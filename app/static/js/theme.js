@@ -0,0 +1,30 @@
+(() => {
+  const storageKey = "carbsmart-theme";
+  const root = document.documentElement;
+  const stored = localStorage.getItem(storageKey);
+  const theme = stored || "light";
+  root.setAttribute("data-bs-theme", theme);
+
+  const toggle = document.getElementById("themeToggle");
+  const label = document.getElementById("themeLabel");
+  const update = () => {
+    const current = root.getAttribute("data-bs-theme") || "light";
+    if (label) {
+      label.textContent = current === "dark" ? "Dark" : "Light";
+    }
+    if (toggle) {
+      toggle.setAttribute("aria-pressed", current === "dark" ? "true" : "false");
+    }
+  };
+
+  update();
+  if (toggle) {
+    toggle.addEventListener("click", () => {
+      const current = root.getAttribute("data-bs-theme") || "light";
+      const next = current === "light" ? "dark" : "light";
+      root.setAttribute("data-bs-theme", next);
+      localStorage.setItem(storageKey, next);
+      update();
+    });
+  }
+})();
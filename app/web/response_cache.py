@@ -0,0 +1,67 @@
+"""Bounded LRU cache for rendered response bodies."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class ResponseCache:
+    """LRU of rendered bodies keyed by ``(pan_id, *rest)`` tuples.
+
+    Keys lead with the pan id so every entry for a pan can be evicted
+    when that pan changes.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[int, Hashable], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[int, Hashable]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: tuple[int, Hashable], body: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict_pan(self, pan_id: int | None) -> None:
+        with self._lock:
+            if pan_id is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == pan_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, float | int]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,3 +1,4 @@
+import os
 from html import escape
 from urllib.parse import urlencode
 
@@ -5,13 +6,26 @@ from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.conditional import CatalogValidators, catalog_validators
+from app.db import DbSession, get_db_session
+from app.history import record_weigh_in
+from app.metrics import calculate_plan_seconds
 from app.repositories import pans as pans_repo
+from app.repositories.catalog import pan_catalog
 from app.services.calc import calculate_plan
+from app.web.response_cache import ResponseCache
 from app.web.templates import templates
 
 router = APIRouter()
 
+# Larger catalogs get a search box backed by /api/pans/search instead of
+# embedding every pan in the dropdown.
+INLINE_PAN_LIMIT = int(os.getenv("CALC_INLINE_PAN_LIMIT", "50"))
+
+# Rendered mini share pages, keyed on the pan and the normalized inputs.
+mini_cache = ResponseCache(maxsize=int(os.getenv("MINI_CACHE_SIZE", "1024")))
+pan_catalog.subscribe(mini_cache.evict_pan)
+
 
 def _pan_label(pan) -> str:
     label = pan.name
@@ -32,8 +46,19 @@ def _pan_options(pans):
     return [{"id": pan.id, "label": _pan_label(pan)} for pan in pans]
 
 
+def _pan_picker(db: Session, selected_id: int | None = None) -> dict:
+    pan_count = pans_repo.count_pans(db)
+    if pan_count <= INLINE_PAN_LIMIT:
+        options = pan_catalog.derived(db, "pan_options", _pan_options)
+        return {"pans": options, "has_pans": bool(pan_count), "pan_search": False}
+
+    selected = pan_catalog.get_pan(db, selected_id) if selected_id is not None else None
+    options = _pan_options([selected]) if selected else []
+    return {"pans": options, "has_pans": True, "pan_search": True}
+
+
 @router.get("/calc", response_class=HTMLResponse)
-def calc_page(
+async def calc_page(
     request: Request,
     pan_id: int | None = Query(default=None),
     total_weight_grams: float | None = Query(default=None),
@@ -42,24 +67,29 @@ def calc_page(
     target_min_grams: float | None = Query(default=None),
     target_max_grams: float | None = Query(default=None),
     view: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    validators: CatalogValidators = Depends(catalog_validators),
+    db: DbSession = Depends(get_db_session),
 ) -> HTMLResponse:
-    pans = pans_repo.list_pans(db)
+    # The page is a pure function of the query string and the catalog.
+    if validators.matches(request):
+        return validators.not_modified()
 
     has_params = pan_id is not None and total_weight_grams is not None and total_carbs is not None
+    picker = await db.run(_pan_picker, pan_id if has_params else None)
     if not has_params:
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": {}, "result": None, "error": None, "share_url": None, "active_nav": "calc"},
+            {**picker, "form": {}, "result": None, "error": None, "share_url": None, "active_nav": "calc"},
         )
+        return validators.apply(response)
 
-    pan = pans_repo.get_pan(db, pan_id)
+    pan = await db.run(pan_catalog.get_pan, pan_id)
     if not pan:
         return templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": {}, "result": None, "error": "Pan not found", "share_url": None, "active_nav": "calc"},
+            {**picker, "form": {}, "result": None, "error": "Pan not found", "share_url": None, "active_nav": "calc"},
             status_code=404,
         )
 
@@ -75,28 +105,35 @@ def calc_page(
         "target_max_grams": f"{eff_max}",
     }
 
+    mini_key = (pan.id, pan.weight_grams, pan.updated_at, tuple(form_values.values()))
+    if view == "mini":
+        body = mini_cache.get(mini_key)
+        if body is not None:
+            return validators.apply(HTMLResponse(body))
+
     if target_servings is None and eff_min > eff_max:
         return templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": form_values, "result": None, "error": "Target min must be <= target max", "share_url": None, "active_nav": "calc"},
+            {**picker, "form": form_values, "result": None, "error": "Target min must be <= target max", "share_url": None, "active_nav": "calc"},
             status_code=422,
         )
 
     try:
-        net_weight, servings, serving_weight, carbs_per_serving = calculate_plan(
-            total_weight_grams,
-            pan.weight_grams,
-            total_carbs,
-            eff_min,
-            eff_max,
-            target_servings,
-        )
+        with calculate_plan_seconds.time():
+            net_weight, servings, serving_weight, carbs_per_serving = calculate_plan(
+                total_weight_grams,
+                pan.weight_grams,
+                total_carbs,
+                eff_min,
+                eff_max,
+                target_servings,
+            )
     except ValueError as exc:
         return templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": form_values, "result": None, "error": str(exc), "share_url": None, "active_nav": "calc"},
+            {**picker, "form": form_values, "result": None, "error": str(exc), "share_url": None, "active_nav": "calc"},
             status_code=422,
         )
 
@@ -111,21 +148,24 @@ def calc_page(
     full_url = _build_share_url(form_values, mini=False)
 
     if view == "mini":
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             request,
             "calc/mini.html",
             {"result": result, "full_url": full_url, "mini_url": mini_url, "active_nav": "calc"},
         )
+        mini_cache.put(mini_key, response.body)
+        return validators.apply(response)
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         request,
         "calc/page.html",
-        {"pans": _pan_options(pans), "form": form_values, "result": result, "share_url": mini_url, "active_nav": "calc"},
+        {**picker, "form": form_values, "result": result, "share_url": mini_url, "active_nav": "calc"},
     )
+    return validators.apply(response)
 
 
 @router.post("/calc", response_class=HTMLResponse)
-def calc_submit(
+async def calc_submit(
     request: Request,
     pan_id: int = Form(...),
     total_weight_grams: float = Form(...),
@@ -133,10 +173,10 @@ def calc_submit(
     target_servings: int | None = Form(default=None),
     target_min_grams: float = Form(200),
     target_max_grams: float = Form(300),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db_session),
 ) -> HTMLResponse:
-    pans = pans_repo.list_pans(db)
-    pan = pans_repo.get_pan(db, pan_id)
+    picker = await db.run(_pan_picker, pan_id)
+    pan = await db.run(pan_catalog.get_pan, pan_id)
     if not pan:
         raise HTTPException(status_code=404, detail="Pan not found")
 
@@ -153,27 +193,32 @@ def calc_submit(
         return templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": form_values, "result": None, "error": "Target min must be <= target max", "share_url": None, "active_nav": "calc"},
+            {**picker, "form": form_values, "result": None, "error": "Target min must be <= target max", "share_url": None, "active_nav": "calc"},
             status_code=422,
         )
 
     try:
-        net_weight, servings, serving_weight, carbs_per_serving = calculate_plan(
-            total_weight_grams,
-            pan.weight_grams,
-            total_carbs,
-            target_min_grams,
-            target_max_grams,
-            target_servings,
-        )
+        with calculate_plan_seconds.time():
+            plan = calculate_plan(
+                total_weight_grams,
+                pan.weight_grams,
+                total_carbs,
+                target_min_grams,
+                target_max_grams,
+                target_servings,
+            )
     except ValueError as exc:
         return templates.TemplateResponse(
             request,
             "calc/page.html",
-            {"pans": _pan_options(pans), "form": form_values, "result": None, "error": str(exc), "share_url": None, "active_nav": "calc"},
+            {**picker, "form": form_values, "result": None, "error": str(exc), "share_url": None, "active_nav": "calc"},
             status_code=422,
         )
 
+    # Only submits are logged; opening a shared link re-renders a weigh-in already recorded.
+    record_weigh_in("web", pan, total_weight_grams, total_carbs, target_min_grams, target_max_grams, target_servings, plan)
+    net_weight, servings, serving_weight, carbs_per_serving = plan
+
     result = {
         "net_weight_grams": f"{net_weight:.1f}",
         "servings": f"{servings}",
@@ -185,5 +230,5 @@ def calc_submit(
     return templates.TemplateResponse(
         request,
         "calc/page.html",
-        {"pans": _pan_options(pans), "form": form_values, "result": result, "share_url": share_url, "active_nav": "calc"},
+        {**picker, "form": form_values, "result": result, "share_url": share_url, "active_nav": "calc"},
     )
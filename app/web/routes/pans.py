@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.conditional import CatalogValidators, catalog_validators
+from app.db import DbSession, get_db_session
 from app.models import PanCreate, PanUpdate
 from app.repositories import pans as pans_repo
 from app.web.templates import templates
@@ -12,28 +12,33 @@ router = APIRouter()
 
 
 @router.get("/pans", response_class=HTMLResponse)
-def pans_page(
+async def pans_page(
     request: Request,
     created: int | None = None,
     updated: int | None = None,
-    db: Session = Depends(get_db),
+    validators: CatalogValidators = Depends(catalog_validators),
+    db: DbSession = Depends(get_db_session),
 ) -> HTMLResponse:
-    pans = pans_repo.list_pans(db)
-    return templates.TemplateResponse(
+    if validators.matches(request):
+        return validators.not_modified()
+
+    pans = await db.run(pans_repo.list_pans)
+    response = templates.TemplateResponse(
         request,
         "pans/list.html",
         {"pans": pans, "created": bool(created), "updated": bool(updated), "error": None, "active_nav": "pans"},
     )
+    return validators.apply(response)
 
 
 @router.post("/pans")
-def create_pan(
+async def create_pan(
     request: Request,
     name: str = Form(...),
     weight_grams: float = Form(...),
     capacity_label: str | None = Form(default=None),
     notes: str | None = Form(default=None),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db_session),
 ):
     payload = PanCreate(
         name=name,
@@ -42,10 +47,10 @@ def create_pan(
         notes=notes or None,
     )
     try:
-        pans_repo.create_pan(db, payload)
+        await db.run(pans_repo.create_pan, payload)
     except IntegrityError:
-        db.rollback()
-        pans = pans_repo.list_pans(db)
+        await db.rollback()
+        pans = await db.run(pans_repo.list_pans)
         return templates.TemplateResponse(
             request,
             "pans/list.html",
@@ -57,8 +62,8 @@ def create_pan(
 
 
 @router.get("/pans/{pan_id}/edit", response_class=HTMLResponse)
-def edit_pan_page(request: Request, pan_id: int, db: Session = Depends(get_db)) -> HTMLResponse:
-    pan = pans_repo.get_pan(db, pan_id)
+async def edit_pan_page(request: Request, pan_id: int, db: DbSession = Depends(get_db_session)) -> HTMLResponse:
+    pan = await db.run(pans_repo.get_pan, pan_id)
     if not pan:
         raise HTTPException(status_code=404, detail="Pan not found")
 
@@ -70,19 +75,15 @@ def edit_pan_page(request: Request, pan_id: int, db: Session = Depends(get_db))
 
 
 @router.post("/pans/{pan_id}")
-def update_pan(
+async def update_pan(
     request: Request,
     pan_id: int,
     name: str = Form(...),
     weight_grams: float = Form(...),
     capacity_label: str | None = Form(default=None),
     notes: str | None = Form(default=None),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db_session),
 ):
-    pan = pans_repo.get_pan(db, pan_id)
-    if not pan:
-        raise HTTPException(status_code=404, detail="Pan not found")
-
     payload = PanUpdate(
         name=name,
         weight_grams=weight_grams,
@@ -90,15 +91,17 @@ def update_pan(
         notes=notes or None,
     )
     try:
-        pans_repo.update_pan(db, pan, payload)
+        pan = await db.run(pans_repo.update_pan, pan_id, payload)
     except IntegrityError:
-        db.rollback()
-        pans = pans_repo.list_pans(db)
+        await db.rollback()
+        pans = await db.run(pans_repo.list_pans)
         return templates.TemplateResponse(
             request,
             "pans/list.html",
             {"pans": pans, "created": False, "updated": False, "error": "Pan name + capacity already exists", "active_nav": "pans"},
             status_code=409,
         )
+    if not pan:
+        raise HTTPException(status_code=404, detail="Pan not found")
 
     return RedirectResponse(url="/pans?updated=1", status_code=303)
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import mimetypes
+import sys
+from functools import cached_property
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+from app.compression import accepts_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional "compression" extra
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_URL = "/static"
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt"}
+# Served in this order of preference when the client accepts them.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetManifest:
+    """Maps each static file to a content-hashed name, e.g. ``css/app.3f9c0e1a2b.css``."""
+
+    def __init__(self, directory: Path = STATIC_DIR, url: str = STATIC_URL) -> None:
+        self.directory = directory
+        self.url_prefix = url
+
+    @cached_property
+    def fingerprints(self) -> dict[str, str]:
+        names = {}
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.suffix in {".gz", ".br"}:
+                continue
+            source = path.relative_to(self.directory).as_posix()
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+            stem, dot, suffix = source.rpartition(".")
+            names[source] = f"{stem}.{digest}.{suffix}" if dot else f"{source}.{digest}"
+        return names
+
+    @cached_property
+    def digest(self) -> str:
+        """Changes whenever any hashed asset URL does."""
+        manifest = "\n".join(f"{source}={hashed}" for source, hashed in self.fingerprints.items())
+        return hashlib.sha256(manifest.encode()).hexdigest()[:12]
+
+    @cached_property
+    def sources(self) -> dict[str, str]:
+        return {hashed: source for source, hashed in self.fingerprints.items()}
+
+    def url(self, source: str) -> str:
+        return f"{self.url_prefix}/{self.fingerprints[source]}"
+
+    def source_for(self, path: str) -> str | None:
+        return self.sources.get(path)
+
+
+class AssetFiles(StaticFiles):
+    """Serves fingerprinted assets with immutable caching and precompressed variants.
+
+    Unhashed paths are still served, with the default validators only.
+    """
+
+    def __init__(self, manifest: AssetManifest) -> None:
+        super().__init__(directory=manifest.directory)
+        self.manifest = manifest
+
+    def _fresh(self, source: str, suffix: str) -> bool:
+        # Ignore variants left over from an older copy of the file.
+        compressed = self.manifest.directory / f"{source}{suffix}"
+        try:
+            return compressed.stat().st_mtime >= (self.manifest.directory / source).stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+    async def get_response(self, path: str, scope):
+        source = self.manifest.source_for(path)
+        if source is None:
+            return await super().get_response(path, scope)
+
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        encoding, variant = None, source
+        for name, suffix in ENCODINGS:
+            if accepts_encoding(accepted, name) and self._fresh(source, suffix):
+                encoding, variant = name, f"{source}{suffix}"
+                break
+
+        response = await super().get_response(variant, scope)
+        response.headers["cache-control"] = IMMUTABLE
+        response.headers["vary"] = "Accept-Encoding"
+        if encoding is not None and response.status_code == 200:
+            content_type = mimetypes.guess_type(source)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type.endswith("javascript"):
+                content_type += "; charset=utf-8"
+            response.headers["content-type"] = content_type
+            response.headers["content-encoding"] = encoding
+        return response
+
+
+def compress_assets(directory: Path = STATIC_DIR) -> list[Path]:
+    """Write ``.gz`` (and ``.br`` when brotli is installed) next to each text asset."""
+    written = []
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE:
+            continue
+        data = path.read_bytes()
+        variants = [(path.with_name(path.name + ".gz"), lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((path.with_name(path.name + ".br"), lambda: brotli.compress(data, quality=11)))
+        for target, compress in variants:
+            if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            target.write_bytes(compress())
+            written.append(target)
+    return written
+
+
+assets = AssetManifest()
+
+
+if __name__ == "__main__":
+    for target in compress_assets(Path(sys.argv[1]) if len(sys.argv) > 1 else STATIC_DIR):
+        print(target)
@@ -1,10 +1,91 @@
+import hashlib
+import os
+from functools import cache
 from pathlib import Path
 
+import jinja2
 from fastapi.templating import Jinja2Templates
+from jinja2 import Template
 
-from app import __version__
+from app import get_version
+from app.metrics import template_load_seconds, template_render_seconds
+from app.web.static import assets
 
 _templates_dir = Path(__file__).resolve().parent.parent / "templates"
 
-templates = Jinja2Templates(directory=str(_templates_dir))
-templates.env.globals["version"] = __version__
+# "production" turns off per-render mtime checks, caches compiled bytecode on
+# disk (shared by every worker) and compiles all templates at startup.
+TEMPLATE_MODE = os.getenv("TEMPLATE_MODE", "development")
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR") or None
+
+
+class TimedTemplate(Template):
+    def render(self, *args, **kwargs) -> str:
+        with template_render_seconds.time(self.name or "<string>"):
+            return super().render(*args, **kwargs)
+
+
+class TimedFileSystemLoader(jinja2.FileSystemLoader):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.loaded: set[str] = set()
+        self.reloads = 0
+
+    # Covers reading the source and either compiling it or loading bytecode.
+    # Jinja only gets here on a first load or, with auto_reload, after an edit.
+    def load(self, environment, name, globals=None):
+        if name in self.loaded:
+            self.reloads += 1
+        self.loaded.add(name)
+        with template_load_seconds.time(name):
+            return super().load(environment, name, globals)
+
+
+def build_templates(production: bool = False, cache_dir: str | None = None) -> Jinja2Templates:
+    options = {}
+    if production:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        options = {"auto_reload": False, "bytecode_cache": jinja2.FileSystemBytecodeCache(cache_dir)}
+    env = jinja2.Environment(
+        loader=TimedFileSystemLoader(str(_templates_dir)),
+        autoescape=jinja2.select_autoescape(),
+        **options,
+    )
+    env.template_class = TimedTemplate
+    env.globals["version"] = get_version
+    env.globals["static"] = assets.url
+    return Jinja2Templates(env=env)
+
+
+@cache
+def _source_stamp() -> str:
+    stamp = hashlib.sha256(TEMPLATE_MODE.encode())
+    for path in sorted(_templates_dir.rglob("*")):
+        if path.is_file():
+            stat = path.stat()
+            stamp.update(f"|{path.relative_to(_templates_dir).as_posix()}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return stamp.hexdigest()[:12]
+
+
+def templates_fingerprint() -> str:
+    """Changes whenever rendered pages could change without a version bump.
+
+    The template tree is stamped once per process. In development Jinja's
+    own ``auto_reload`` check reloads edited templates, and the loader's reload
+    count picks that up without any filesystem access here.
+    """
+    if TEMPLATE_MODE == "production":
+        return _source_stamp()
+    return f"{_source_stamp()}.{templates.env.loader.reloads}"
+
+
+def precompile_templates(env: jinja2.Environment | None = None) -> int:
+    env = env or templates.env
+    names = env.list_templates(filter_func=lambda name: name.endswith(".html"))
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+templates = build_templates(TEMPLATE_MODE == "production", TEMPLATE_CACHE_DIR)
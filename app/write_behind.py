@@ -0,0 +1,231 @@
+"""Asyncio write-behind queue for writes nobody waits to read back.
+
+With ``WRITE_BEHIND=1`` the app lifespan starts one worker task per process.
+Routes submit weigh-in rows and pan uses with ``put_nowait``. The worker
+collects them for up to ``WRITE_BEHIND_FLUSH_SECONDS`` after the first one
+arrives, or until ``WRITE_BEHIND_BATCH_SIZE`` are waiting. It then coalesces
+the batch, so many uses of one pan become one counter update, and writes it
+in a single transaction on the threadpool. Shutdown drains the queue.
+
+Pan creates and edits are not queued: the page they redirect to reads them
+back, and conflicts must be reported to the user.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db import SessionLocal
+from app.metrics import write_behind_batch_ops, write_behind_flush_seconds, write_behind_queue_depth
+from app.repositories.pan_usage import add_pan_usage
+from app.repositories.weigh_ins import add_weigh_ins
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "").lower() in {"1", "true", "yes"}
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1"))
+# Writes held while the database is unavailable; new ones are dropped past this.
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "50000"))
+WRITE_BEHIND_DRAIN_SECONDS = float(os.getenv("WRITE_BEHIND_DRAIN_SECONDS", "10"))
+
+_STOP = object()
+
+
+@dataclass
+class WriteBatch:
+    weigh_ins: list[dict[str, Any]] = field(default_factory=list)
+    # pan_id -> (uses, last used at)
+    pan_uses: dict[int, tuple[int, datetime]] = field(default_factory=dict)
+    ops: int = 0
+
+    def add(self, kind: str, payload: Any) -> None:
+        self.ops += 1
+        if kind == "weigh_in":
+            self.weigh_ins.append(payload)
+        elif kind == "pan_use":
+            pan_id, at = payload
+            count, last = self.pan_uses.get(pan_id, (0, at))
+            self.pan_uses[pan_id] = (count + 1, max(last, at))
+        else:
+            raise ValueError(f"Unknown write-behind operation: {kind!r}")
+
+    def merge(self, other: "WriteBatch") -> None:
+        self.weigh_ins = other.weigh_ins + self.weigh_ins
+        for pan_id, (count, at) in other.pan_uses.items():
+            mine = self.pan_uses.get(pan_id)
+            self.pan_uses[pan_id] = (count + mine[0], max(at, mine[1])) if mine else (count, at)
+        self.ops += other.ops
+
+    def pending(self) -> int:
+        return len(self.weigh_ins) + len(self.pan_uses)
+
+
+def write_batch(db: Session, batch: WriteBatch) -> None:
+    if batch.weigh_ins:
+        add_weigh_ins(db, batch.weigh_ins)
+    add_pan_usage(db, batch.pan_uses)
+    db.commit()
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        write: Callable[[Session, WriteBatch], None] = write_batch,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_seconds: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        session_factory: Callable[[], AbstractContextManager[Session]] = SessionLocal,
+    ) -> None:
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._carry: WriteBatch | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def depth(self) -> int:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + (self._carry.pending() if self._carry else 0)
+
+    def submit(self, kind: str, payload: Any) -> bool:
+        """Queue a write from the event loop; returns False when the worker is not running."""
+        if self._queue is None:
+            return False
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+        else:
+            self._queue.put_nowait((kind, payload))
+        return True
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(self._queue), name="write-behind")
+
+    async def stop(self, timeout: float = WRITE_BEHIND_DRAIN_SECONDS) -> None:
+        """Stop accepting writes, flush everything queued and wait for the worker."""
+        if self._task is None:
+            return
+        queue, task = self._queue, self._task
+        self._queue = None
+        queue.put_nowait(_STOP)
+        try:
+            await asyncio.wait_for(task, timeout)
+        except TimeoutError:
+            logger.error("Write-behind drain timed out with %d writes queued", queue.qsize())
+        finally:
+            self._task = None
+        if self._carry is not None:
+            logger.error("Discarding %d writes that could not be flushed", self._carry.ops)
+            self.dropped += self._carry.ops
+            self._carry = None
+
+    async def _collect(self, queue: asyncio.Queue) -> tuple[WriteBatch, bool]:
+        batch = WriteBatch()
+        if self._carry is None:
+            item = await queue.get()
+        else:
+            # Retry a failed batch on schedule even if nothing new arrives.
+            try:
+                item = await asyncio.wait_for(queue.get(), self.flush_seconds)
+            except TimeoutError:
+                return batch, False
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            if item is _STOP:
+                # Take whatever was queued before the stop, then finish.
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if item is not _STOP:
+                        batch.add(*item)
+                return batch, True
+            batch.add(*item)
+            if batch.ops >= self.batch_size:
+                return batch, False
+            try:
+                item = queue.get_nowait()
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, False
+            try:
+                item = await asyncio.wait_for(queue.get(), remaining)
+            except TimeoutError:
+                return batch, False
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect(queue)
+            await self.flush(batch)
+
+    def _write(self, batch: WriteBatch) -> None:
+        with self.session_factory() as db:
+            self.write(db, batch)
+
+    async def flush(self, batch: WriteBatch) -> None:
+        if self._carry is not None:
+            batch.merge(self._carry)
+            self._carry = None
+        if not batch.ops:
+            return
+        start = time.perf_counter()
+        try:
+            await run_in_threadpool(self._write, batch)
+        except Exception:
+            logger.exception("Write-behind flush of %d writes failed; will retry", batch.ops)
+            self.failed_flushes += 1
+            overflow = len(batch.weigh_ins) - self.max_pending
+            if overflow > 0:
+                del batch.weigh_ins[:overflow]
+                batch.ops -= overflow
+                self.dropped += overflow
+            self._carry = batch
+            return
+        finally:
+            write_behind_flush_seconds.observe(time.perf_counter() - start)
+        write_behind_batch_ops.observe(batch.ops)
+        self.flushes += 1
+        self.written += batch.ops
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            "running": self.running,
+            "depth": self.depth,
+            "flushes": self.flushes,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def clear(self) -> None:
+        self.flushes = self.written = self.dropped = self.failed_flushes = 0
+        self._carry = None
+
+
+write_behind = WriteBehindQueue()
+write_behind_queue_depth.set_function(lambda: write_behind.depth)
@@ -0,0 +1 @@
+"""Micro-benchmarks for CarbSmart hot paths."""
@@ -0,0 +1,52 @@
+"""Compare per-row calculate_plan with the vectorized calculate_plans.
+
+Run with ``python -m benchmarks.bench_calculate_plan`` (requires NumPy).
+"""
+
+import time
+
+import numpy as np
+
+from app.services.calc import calculate_plan
+from app.services.calc_vector import calculate_plans
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def _weigh_ins(rows: int) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(0)
+    pan = rng.uniform(200, 3000, rows).round(1)
+    total = pan + rng.uniform(100, 40_000, rows).round(1)
+    carbs = rng.uniform(0, 500, rows).round(1)
+    lo = rng.choice([150.0, 200.0, 250.0], rows)
+    hi = lo + rng.choice([50.0, 100.0, 150.0], rows)
+    forced = np.where(rng.random(rows) < 0.2, rng.integers(1, 12, rows), 0)
+    return total, pan, carbs, lo, hi, forced
+
+
+def _scalar(total, pan, carbs, lo, hi, forced) -> None:
+    for row in zip(total.tolist(), pan.tolist(), carbs.tolist(), lo.tolist(), hi.tolist(), forced.tolist()):
+        *plan_args, target = row
+        try:
+            calculate_plan(*plan_args, target or None)
+        except ValueError:
+            pass
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'rows':>10} {'scalar s':>10} {'vector s':>10} {'speedup':>8}")
+    for rows in SIZES:
+        data = _weigh_ins(rows)
+        scalar = _timed(_scalar, *data)
+        vector = _timed(calculate_plans, *data)
+        print(f"{rows:>10} {scalar:>10.3f} {vector:>10.3f} {scalar / vector:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Compare choose_servings against the linear scan as the batch grows.
+
+Run with ``python -m benchmarks.bench_choose_servings``.
+"""
+
+import timeit
+
+from app.services.calc import _choose_servings_linear, choose_servings
+
+# (net weight, target min, target max): scan length is ceil(net / min)
+CASES = [
+    (1_000, 200, 300),
+    (10_000, 200, 300),
+    (40_000, 200, 300),
+    (40_000, 20, 30),
+    (40_000, 1, 3),
+]
+
+
+def _per_call_us(func, args, number: int) -> float:
+    best = min(timeit.repeat(lambda: func(*args), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    print(f"{'net g':>8} {'min-max':>9} {'scan len':>9} {'linear us':>11} {'solver us':>10} {'speedup':>8}")
+    for net, lo, hi in CASES:
+        args = (net, lo, hi)
+        scan_len = -(-net // lo)
+        number = max(1, 20_000 // scan_len)
+        linear = _per_call_us(_choose_servings_linear, args, number)
+        solver = _per_call_us(choose_servings, args, 2_000)
+        print(f"{net:>8} {f'{lo}-{hi}':>9} {scan_len:>9} {linear:>11.1f} {solver:>10.2f} {linear / solver:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Report how long ``import app.main`` takes in a fresh interpreter.
+
+Run with ``python -m benchmarks.bench_import_time``. Uses
+``python -X importtime`` and prints the median total plus the slowest
+modules by cumulative time from the last run.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_times(module: str) -> dict[str, int]:
+    env = {**os.environ, "DATABASE_URL": os.environ.get("DATABASE_URL", "sqlite://")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module>"
+        _, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    times: dict[str, int] = {}
+    for _ in range(args.runs):
+        times = _import_times(args.module)
+        totals.append(times[args.module])
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms over {args.runs} runs")
+    print(f"{'cumulative ms':>14}  module")
+    for name, cumulative in sorted(times.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
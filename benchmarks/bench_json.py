@@ -0,0 +1,67 @@
+"""Serialization time and bytes on the wire for large pan catalogs.
+
+Run with ``python -m benchmarks.bench_json``. Compares the stdlib
+``JSONResponse`` path, ``FastJSONResponse`` (orjson when installed) and
+``model_json_response`` (Pydantic core), then the payload size with gzip
+and brotli at the levels ``CompressionMiddleware`` uses.
+"""
+
+import gzip
+import json
+import timeit
+from datetime import datetime
+
+from pydantic import TypeAdapter
+
+from app.api.responses import model_json_response
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.db_models import Pan as PanRow
+from app.models import Pan
+from app.serialization import dumps, orjson
+
+SIZES = [1_000, 10_000, 100_000]
+ADAPTER = TypeAdapter(list[Pan])
+
+
+def _catalog(size: int) -> list[PanRow]:
+    now = datetime(2026, 1, 1)
+    return [
+        PanRow(id=i, name=f"Pan {i:06d}", weight_grams=100.5 + i % 900, capacity_label="Half", notes=None, created_at=now, updated_at=now)
+        for i in range(1, size + 1)
+    ]
+
+
+def _stdlib(rows) -> bytes:
+    content = ADAPTER.dump_python(ADAPTER.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def _fast(rows) -> bytes:
+    return dumps(ADAPTER.dump_python(ADAPTER.validate_python(rows, from_attributes=True), mode="json"))
+
+
+def _model(rows) -> bytes:
+    return model_json_response(ADAPTER, rows).body
+
+
+def _ms(func, rows) -> float:
+    number = max(1, 20_000 // len(rows))
+    return min(timeit.repeat(lambda: func(rows), number=number, repeat=3)) / number * 1000
+
+
+def main() -> None:
+    print(f"orjson {'installed' if orjson else 'missing (stdlib fallback)'}, brotli {'installed' if brotli else 'missing'}")
+    print(f"{'pans':>8} {'stdlib ms':>10} {'fast ms':>9} {'model ms':>9} {'raw KB':>9} {'gzip KB':>9} {'br KB':>8}")
+    for size in SIZES:
+        rows = _catalog(size)
+        body = _model(rows)
+        gz = len(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        br = len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else float("nan")
+        print(
+            f"{size:>8} {_ms(_stdlib, rows):>10.1f} {_ms(_fast, rows):>9.1f} {_ms(_model, rows):>9.1f} "
+            f"{len(body) / 1024:>9.1f} {gz / 1024:>9.1f} {br / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Read/write throughput on a file-backed SQLite database, default vs tuned.
+
+Run with ``python -m benchmarks.bench_sqlite_concurrency``. Each profile
+runs reader and writer threads against a fresh database for a fixed
+duration and reports completed operations and "database is locked" errors.
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db import Base, create_app_engine
+from app.db_models import Pan
+
+
+def _default_engine(url: str):
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def _seed(engine, pans: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all(Pan(name=f"Pan {i}", weight_grams=100 + i) for i in range(pans))
+        db.commit()
+
+
+def _run(engine, readers: int, writers: int, seconds: float, pans: int) -> dict[str, int]:
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def bump(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def reader() -> None:
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as db:
+                    db.execute(select(Pan).order_by(Pan.name).limit(50)).scalars().all()
+                bump("reads")
+            except OperationalError:
+                bump("locked")
+
+    def writer(offset: int) -> None:
+        i = offset
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as db:
+                    db.execute(update(Pan).where(Pan.id == i % pans + 1).values(weight_grams=Pan.weight_grams + 1))
+                    db.commit()
+                bump("writes")
+            except OperationalError:
+                bump("locked")
+            i += writers
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--pans", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'reads/s':>9} {'writes/s':>9} {'locked':>7}")
+    for profile, factory in (("default", _default_engine), ("tuned", create_app_engine)):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+            engine = factory(url)
+            _seed(engine, args.pans)
+            counts = _run(engine, args.readers, args.writers, args.seconds, args.pans)
+            engine.dispose()
+        print(
+            f"{profile:>8} {counts['reads'] / args.seconds:>9.0f} "
+            f"{counts['writes'] / args.seconds:>9.0f} {counts['locked']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
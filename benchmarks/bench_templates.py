@@ -0,0 +1,43 @@
+"""Cold template load cost with and without the bytecode cache.
+
+Run with ``python -m benchmarks.bench_templates``. Each iteration builds a
+fresh environment, as a newly started worker would, and loads every
+template; then times rendering the mini share page from a warm environment.
+"""
+
+import tempfile
+import timeit
+
+from app.web.templates import build_templates, precompile_templates
+
+MINI_CONTEXT = {
+    "result": {"net_weight_grams": "1500.0", "servings": "6", "serving_weight_grams": "250.0", "carbs_per_serving": "20.0"},
+    "full_url": "/calc?pan_id=1",
+    "mini_url": "/calc?pan_id=1&view=mini",
+    "active_nav": "calc",
+}
+
+
+def _cold_ms(production: bool, cache_dir: str | None, number: int = 20) -> float:
+    best = min(
+        timeit.repeat(lambda: precompile_templates(build_templates(production, cache_dir).env), number=number, repeat=5)
+    )
+    return best / number * 1000
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        precompile_templates(build_templates(True, cache_dir).env)
+        parse = _cold_ms(False, None)
+        cached = _cold_ms(True, cache_dir)
+    print(f"cold load, parse + compile:   {parse:>7.2f} ms")
+    print(f"cold load, bytecode cache:    {cached:>7.2f} ms ({parse / cached:.1f}x)")
+
+    template = build_templates().env.get_template("calc/mini.html")
+    number = 2_000
+    render = min(timeit.repeat(lambda: template.render(MINI_CONTEXT), number=number, repeat=5)) / number * 1e6
+    print(f"render calc/mini.html (warm): {render:>7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Synthetic kitchen workload against a locally started uvicorn.
+
+Run with ``python -m benchmarks.load_test``. Seeds a temp-file SQLite
+database with ``--pans`` pans, starts ``uvicorn app.main:app`` on a free
+port and has ``--cooks`` concurrent clients replay a weighted mix of
+requests for ``--duration`` seconds, then prints throughput and latency
+percentiles per operation. Pass ``--url`` to target a server that is
+already running (it must already have pans with ids 1..N).
+
+Operations and the endpoints they hit:
+
+- ``calc``: ``POST /calc`` (web form submit, ``app/web/routes/calc.py``)
+- ``mini``: ``GET /calc?...&view=mini`` (shared mini links, drawn from a
+  small popular set so the mini cache sees realistic reuse)
+- ``api_calc``: ``POST /api/calc`` (``app/api/routes/calc.py``)
+- ``list``: ``GET /api/pans`` (``app/api/routes/pans.py``)
+- ``edit``: ``PUT /api/pans/{id}`` (weight re-tare after a scale check)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from sqlalchemy import insert
+
+from app.db import Base, create_app_engine
+from app.db_models import Pan
+
+OPERATIONS = ("calc", "mini", "api_calc", "list", "edit")
+DEFAULT_MIX = {"calc": 30, "mini": 40, "api_calc": 15, "list": 10, "edit": 5}
+
+
+def _seed(url: str, pans: int) -> None:
+    engine = create_app_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rows = [
+        {"name": f"Pan {i:06d}", "weight_grams": round(random.uniform(200, 3000), 1), "capacity_label": "Half"}
+        for i in range(pans)
+    ]
+    with engine.begin() as conn:
+        for start in range(0, pans, 10_000):
+            conn.execute(insert(Pan), rows[start : start + 10_000])
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(database_url: str, port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    command += ["--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, env=env, cwd=Path(__file__).resolve().parent.parent)
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen | None, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} not ready after {timeout:.0f}s")
+
+
+class Workload:
+    def __init__(self, pans: int, mix: dict[str, int], popular_links: int, seed: int) -> None:
+        self.pans = pans
+        self.rng = random.Random(seed)
+        self.operations = [op for op in OPERATIONS if mix.get(op)]
+        self.weights = [mix[op] for op in self.operations]
+        self.links = [self._weigh_in() for _ in range(popular_links)]
+
+    def _weigh_in(self) -> dict[str, str]:
+        # Seeded and edited pans weigh at most 3 kg, so every total clears the tare.
+        return {
+            "pan_id": str(self.rng.randint(1, self.pans)),
+            "total_weight_grams": f"{self.rng.uniform(3_300, 11_000):.1f}",
+            "total_carbs": f"{self.rng.uniform(20, 400):.1f}",
+        }
+
+    def next_request(self) -> tuple[str, str, str, dict]:
+        op = self.rng.choices(self.operations, self.weights)[0]
+        if op == "calc":
+            return op, "POST", "/calc", {"data": self._weigh_in()}
+        if op == "mini":
+            # Popular links are opened far more often than the tail.
+            link = self.links[min(int(self.rng.paretovariate(1.2)) - 1, len(self.links) - 1)]
+            return op, "GET", "/calc", {"params": {**link, "view": "mini"}}
+        if op == "api_calc":
+            body = {key: float(value) for key, value in self._weigh_in().items()}
+            body["pan_id"] = int(body["pan_id"])
+            return op, "POST", "/api/calc", {"json": body}
+        if op == "list":
+            return op, "GET", "/api/pans", {"params": {"limit": 50}}
+        pan_id = self.rng.randint(1, self.pans)
+        return op, "PUT", f"/api/pans/{pan_id}", {"json": {"weight_grams": round(self.rng.uniform(200, 3000), 1)}}
+
+
+async def _cook(client: httpx.AsyncClient, workload: Workload, stop: float, think: float, latencies, errors) -> None:
+    while time.perf_counter() < stop:
+        op, method, path, kwargs = workload.next_request()
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+        except httpx.TransportError:
+            ok = False
+        latencies[op].append(time.perf_counter() - start)
+        if not ok:
+            errors[op] += 1
+        if think:
+            await asyncio.sleep(workload.rng.expovariate(1 / think))
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _report(latencies: dict[str, list[float]], errors: dict[str, int], elapsed: float) -> None:
+    print(f"\n{'op':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    everything: list[float] = []
+    for op in [*OPERATIONS, "total"]:
+        values = sorted(everything) if op == "total" else sorted(latencies.get(op, []))
+        if not values:
+            continue
+        if op != "total":
+            everything.extend(values)
+        failed = sum(errors.values()) if op == "total" else errors.get(op, 0)
+        p50, p90, p99 = (_percentile(values, pct) * 1000 for pct in (50, 90, 99))
+        print(
+            f"{op:<10} {len(values):>9} {failed:>7} {len(values) / elapsed:>9.1f} "
+            f"{p50:>8.1f} {p90:>8.1f} {p99:>8.1f} {values[-1] * 1000:>8.1f}"
+        )
+
+
+async def _run(base_url: str, args, mix: dict[str, int]) -> None:
+    workload = Workload(args.pans, mix, args.popular_links, args.seed)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.cooks, max_keepalive_connections=args.cooks)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        if args.warmup:
+            warm_until = time.perf_counter() + args.warmup
+            await asyncio.gather(
+                *(_cook(client, workload, warm_until, 0, defaultdict(list), defaultdict(int)) for _ in range(args.cooks))
+            )
+        start = time.perf_counter()
+        stop = start + args.duration
+        await asyncio.gather(*(_cook(client, workload, stop, args.think, latencies, errors) for _ in range(args.cooks)))
+        elapsed = time.perf_counter() - start
+    print(f"{args.cooks} cooks for {elapsed:.1f}s against {base_url} ({args.pans} pans)")
+    _report(latencies, errors, elapsed)
+
+
+def _parse_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        if op not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {op!r}; choose from {', '.join(OPERATIONS)}")
+        mix[op] = int(weight)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pans", type=int, default=1_000, help="pans to seed")
+    parser.add_argument("--cooks", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load first")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds a cook waits between requests")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="weights, e.g. calc=30,mini=40,edit=5")
+    parser.add_argument("--popular-links", type=int, default=200, help="distinct mini links being shared")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(_run(args.url.rstrip("/"), args, args.mix))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'load.db'}"
+        _seed(database_url, args.pans)
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = _start_server(database_url, port, args.workers)
+        try:
+            asyncio.run(_wait_ready(base_url, server))
+            asyncio.run(_run(base_url, args, args.mix))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Benchmark suite for the calc service, pan repository and HTTP routes.
+
+Run with ``python -m benchmarks.suite``. Everything runs locally: the
+repository cases use a temp-file SQLite database seeded with 10, 1k and
+100k pans, and the route cases go through ``TestClient``.
+
+``--save`` writes the results as a JSON baseline; ``--baseline`` compares
+against one and exits non-zero when any case is slower than the baseline
+by more than ``--threshold`` (default 25%, or ``BENCH_THRESHOLD``).
+Baselines are machine-specific, so record one on the machine that checks.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db import Base, create_app_engine, get_db  # noqa: E402
+from app.db_models import Pan  # noqa: E402
+from app.models import PanCreate, PanUpdate  # noqa: E402
+from app.repositories import pans as pans_repo  # noqa: E402
+from app.services.calc import calculate_plan, choose_servings  # noqa: E402
+
+REPO_SIZES = (10, 1_000, 100_000)
+REPO_OPS = ("get_pan", "create_delete_pan", "update_pan", "list_pans_page", "list_pans_page_prefix", "search_pans", "list_pans")
+ROUTES = ("POST /api/calc", "GET /calc?view=mini", "GET /api/pans")
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], object]
+
+
+def _calc_cases() -> Iterator[Case]:
+    # (net weight, target min, target max): candidate count is ceil(net / min)
+    for net, lo, hi in [(1_000, 200, 300), (10_000, 200, 300), (40_000, 20, 30), (40_000, 1, 3)]:
+        yield Case(f"choose_servings[{-(-net // lo)}]", lambda a=(net, lo, hi): choose_servings(*a))
+    yield Case("calculate_plan", lambda: calculate_plan(2_000, 500, 120, 200, 300))
+    yield Case("calculate_plan[target]", lambda: calculate_plan(2_000, 500, 120, 200, 300, 6))
+
+
+def _seed(engine, pans: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rows = [{"name": f"Pan {i:06d}", "weight_grams": 100 + i % 900, "capacity_label": "Half"} for i in range(pans)]
+    with engine.begin() as conn:
+        for start in range(0, pans, 10_000):
+            conn.execute(insert(Pan), rows[start : start + 10_000])
+
+
+def _repo_cases(stack: ExitStack, size: int) -> Iterator[Case]:
+    path = Path(stack.enter_context(tempfile.TemporaryDirectory())) / f"pans_{size}.db"
+    engine = create_app_engine(f"sqlite:///{path}")
+    stack.callback(engine.dispose)
+    _seed(engine, size)
+    db = Session(engine, expire_on_commit=False)
+    stack.callback(db.close)
+
+    middle = size // 2 + 1
+    counter = iter(range(sys.maxsize))
+
+    def create_delete() -> None:
+        pan = pans_repo.create_pan(db, PanCreate(name=f"Bench {next(counter)}", weight_grams=250))
+        pans_repo.delete_pan(db, pan.id)
+
+    def update() -> None:
+        pans_repo.update_pan(db, middle, PanUpdate(notes=f"n{next(counter)}"))
+
+    funcs = {
+        "get_pan": lambda: pans_repo.get_pan(db, middle),
+        "create_delete_pan": create_delete,
+        "update_pan": update,
+        "list_pans_page": lambda: pans_repo.list_pans_page(db, limit=100),
+        "list_pans_page_prefix": lambda: pans_repo.list_pans_page(db, limit=100, name_prefix="Pan 0001"),
+        "search_pans": lambda: pans_repo.search_pans(db, "pan 00012", limit=10),
+        "list_pans": lambda: pans_repo.list_pans(db),
+    }
+    for op in REPO_OPS:
+        yield Case(f"repo.{op}[{size}]", funcs[op])
+
+
+@contextmanager
+def _client() -> Iterator[object]:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    _seed(engine, 50)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def _override():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _override
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def _route_cases(stack: ExitStack) -> Iterator[Case]:
+    client = stack.enter_context(_client())
+    calc_body = {"pan_id": 1, "total_weight_grams": 2_000, "total_carbs": 120}
+    mini = "/calc?pan_id=1&total_weight_grams=2000&total_carbs=120&view=mini"
+    funcs = {
+        "POST /api/calc": lambda: client.post("/api/calc", json=calc_body),
+        "GET /calc?view=mini": lambda: client.get(mini),
+        "GET /api/pans": lambda: client.get("/api/pans"),
+    }
+    for route in ROUTES:
+        yield Case(f"route.{route}", funcs[route])
+
+
+def _per_call_us(func: Callable[[], object], repeat: int) -> tuple[float, int]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e6, number
+
+
+def run(selected: str | None, sizes: tuple[int, ...], repeat: int) -> dict[str, dict[str, float | int]]:
+    results: dict[str, dict[str, float | int]] = {}
+
+    def wanted(*names: str) -> bool:
+        # Lets -k skip seeding databases for groups it filters out entirely.
+        return not selected or any(selected in name for name in names)
+
+    def measure(cases: Iterator[Case]) -> None:
+        for case in cases:
+            if selected and selected not in case.name:
+                continue
+            us, number = _per_call_us(case.func, repeat)
+            results[case.name] = {"per_call_us": round(us, 3), "number": number}
+            print(f"{case.name:<40} {us:>12.2f} us", flush=True)
+
+    measure(_calc_cases())
+    for size in sizes:
+        if wanted(*(f"repo.{op}[{size}]" for op in REPO_OPS)):
+            with ExitStack() as stack:
+                measure(_repo_cases(stack, size))
+    if wanted(*(f"route.{route}" for route in ROUTES)):
+        with ExitStack() as stack:
+            measure(_route_cases(stack))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = current["per_call_us"] / previous["per_call_us"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {previous['per_call_us']:.2f} -> {current['per_call_us']:.2f} us ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="selected", help="only run cases whose name contains this")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(REPO_SIZES), help="pan counts for the repository cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, help="write results as a baseline")
+    parser.add_argument("--baseline", type=Path, nargs="?", const=DEFAULT_BASELINE, help="fail on regressions against a baseline")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCH_THRESHOLD", "0.25")))
+    args = parser.parse_args()
+
+    results = run(args.selected, tuple(args.sizes), args.repeat)
+
+    if args.save:
+        payload = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+        args.save.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        print(f"saved baseline to {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
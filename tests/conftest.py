@@ -1,17 +1,35 @@
 import os
 
 os.environ["DATABASE_URL"] = "sqlite://"  # in-memory DB for tests
+os.environ["WEIGH_IN_HISTORY"] = "0"  # the client fixture shares one session, which the flusher thread must not use
+
+from datetime import UTC, datetime
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 import app.db_models  # noqa: F401 — register ORM models with Base.metadata
 
 from app.db import Base, get_db
+from app.history import weigh_in_log
 from app.main import app
+from app.metrics import reset_metrics
+from app.repositories.catalog import pan_catalog
+from app.web.routes.calc import mini_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    pan_catalog.clear()
+    mini_cache.clear()
+    reset_metrics()
+    yield
+    pan_catalog.clear()
+    mini_cache.clear()
+    weigh_in_log.clear()
 
 
 @pytest.fixture()
@@ -22,7 +40,7 @@ def db():
         poolclass=StaticPool,
     )
     Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
     session = Session()
     try:
         yield session
@@ -55,3 +73,41 @@ def sample_pan(db):
     db.commit()
     db.refresh(pan)
     return pan
+
+
+@pytest.fixture()
+def sessions(db):
+    """Fresh sessions on the test database, for code that opens its own."""
+    return sessionmaker(bind=db.get_bind(), autoflush=False)
+
+
+@pytest.fixture()
+def count_rows(db):
+    def count(model):
+        db.expire_all()
+        return db.scalar(select(func.count()).select_from(model))
+
+    return count
+
+
+@pytest.fixture()
+def weigh_in_row():
+    def make(pan_id=1, recorded_at=None, **overrides):
+        row = {
+            "pan_id": pan_id,
+            "pan_weight_grams": 500,
+            "total_weight_grams": 1500,
+            "total_carbs": 100,
+            "target_servings": None,
+            "target_min_grams": 200,
+            "target_max_grams": 300,
+            "net_weight_grams": 1000,
+            "servings": 4,
+            "serving_weight_grams": 250,
+            "carbs_per_serving": 25,
+            "source": "api",
+            "recorded_at": recorded_at or datetime.now(UTC),
+        }
+        return {**row, **overrides}
+
+    return make
@@ -107,3 +107,79 @@ class TestCalcAPI:
             "target_servings": 0,
         })
         assert resp.status_code == 422
+
+
+class TestCalcBatchAPI:
+    def test_batch_results_in_order(self, client, sample_pan):
+        resp = client.post("/api/calc/batch", json=[
+            {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100},
+            {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100, "target_servings": 2},
+        ])
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+        assert [item["status_code"] for item in items] == [200, 200]
+        assert items[0]["result"]["servings"] == 4
+        assert items[1]["result"]["serving_weight_grams"] == 500.0
+        assert items[0]["error"] is None
+
+    def test_bad_pan_does_not_fail_batch(self, client, sample_pan):
+        resp = client.post("/api/calc/batch", json=[
+            {"total_weight_grams": 1500, "pan_id": 9999, "total_carbs": 100},
+            {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100},
+        ])
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+        assert items[0]["status_code"] == 404
+        assert items[0]["error"] == "Pan not found"
+        assert items[0]["result"] is None
+        assert items[1]["status_code"] == 200
+
+    def test_per_item_calculation_errors(self, client, sample_pan):
+        resp = client.post("/api/calc/batch", json=[
+            {"total_weight_grams": 100, "pan_id": sample_pan.id, "total_carbs": 50},
+            {
+                "total_weight_grams": 1500,
+                "pan_id": sample_pan.id,
+                "total_carbs": 100,
+                "target_min_grams": 400,
+                "target_max_grams": 200,
+            },
+        ])
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+        assert items[0]["status_code"] == 422
+        assert "greater than pan weight" in items[0]["error"]
+        assert items[1]["status_code"] == 422
+
+    def test_empty_batch(self, client):
+        resp = client.post("/api/calc/batch", json=[])
+        assert resp.status_code == 200
+        assert resp.json() == {"items": []}
+
+    def test_batch_size_capped(self, client, sample_pan):
+        from app.api.routes.calc import MAX_BATCH_ITEMS
+
+        item = {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100}
+        assert client.post("/api/calc/batch", json=[item] * MAX_BATCH_ITEMS).status_code == 200
+        resp = client.post("/api/calc/batch", json=[item] * (MAX_BATCH_ITEMS + 1))
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["type"] == "too_long"
+
+    def test_single_pan_query_for_batch(self, client, db, sample_pan):
+        from sqlalchemy import event
+
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            resp = client.post("/api/calc/batch", json=[
+                {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100},
+            ] * 50)
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        assert resp.status_code == 200
+        assert len([s for s in statements if "FROM pans" in s]) == 1
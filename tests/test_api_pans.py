@@ -1,3 +1,6 @@
+import json
+
+
 class TestListPans:
     def test_empty(self, client):
         resp = client.get("/api/pans")
@@ -45,6 +48,42 @@ class TestCreatePan:
         assert resp.status_code == 422
 
 
+class TestPanWriteQueries:
+    def _queries(self, method, route):
+        from app import metrics
+
+        counts, total = metrics.request_db_queries.snapshot()[(method, route)]
+        return total
+
+    def test_create_is_one_query(self, client):
+        assert client.post("/api/pans", json={"name": "Skillet", "weight_grams": 1200}).status_code == 201
+        assert self._queries("POST", "/api/pans") == 1
+
+    def test_update_is_one_query(self, client, db, sample_pan):
+        db.expunge_all()  # as in a fresh request session
+        response = client.put(f"/api/pans/{sample_pan.id}", json={"weight_grams": 520})
+        assert response.status_code == 200
+        assert response.json()["weight_grams"] == 520
+        assert response.json()["name"] == "Sheet Pan"
+        assert self._queries("PUT", "/api/pans/{pan_id}") == 1
+
+    def test_delete_is_one_query(self, client, sample_pan):
+        assert client.delete(f"/api/pans/{sample_pan.id}").status_code == 204
+        assert self._queries("DELETE", "/api/pans/{pan_id}") == 1
+
+    def test_missing_pan_is_one_query(self, client):
+        assert client.put("/api/pans/9999", json={"weight_grams": 520}).status_code == 404
+        assert client.delete("/api/pans/9999").status_code == 404
+        assert self._queries("PUT", "/api/pans/{pan_id}") == 1
+        assert self._queries("DELETE", "/api/pans/{pan_id}") == 1
+
+    def test_conflict_on_update(self, client, sample_pan):
+        other = client.post("/api/pans", json={"name": "Pot", "weight_grams": 900}).json()
+        response = client.put(f"/api/pans/{other['id']}", json={"name": "Sheet Pan", "capacity_label": "Half"})
+        assert response.status_code == 409
+        assert client.put(f"/api/pans/{other['id']}", json={"weight_grams": 950}).status_code == 200
+
+
 class TestUpdatePan:
     def test_update_name(self, client, sample_pan):
         resp = client.put(f"/api/pans/{sample_pan.id}", json={"name": "Renamed"})
@@ -72,3 +111,188 @@ class TestDeletePan:
     def test_not_found(self, client):
         resp = client.delete("/api/pans/9999")
         assert resp.status_code == 404
+
+
+class TestListPansPagination:
+    def _seed(self, client, names):
+        for name in names:
+            client.post("/api/pans", json={"name": name, "weight_grams": 100})
+
+    def test_pages_follow_cursor(self, client):
+        self._seed(client, ["Delta", "Alpha", "Echo", "Charlie", "Bravo"])
+        names = []
+        resp = client.get("/api/pans", params={"limit": 2})
+        while True:
+            assert resp.status_code == 200
+            names.extend(p["name"] for p in resp.json())
+            cursor = resp.headers.get("x-next-cursor")
+            if not cursor:
+                break
+            assert 'rel="next"' in resp.headers["link"]
+            resp = client.get("/api/pans", params={"limit": 2, "cursor": cursor})
+        assert names == ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]
+
+    def test_last_page_has_no_cursor(self, client, sample_pan):
+        resp = client.get("/api/pans", params={"limit": 1})
+        assert len(resp.json()) == 1
+        assert "x-next-cursor" not in resp.headers
+
+    def test_duplicate_names_split_by_id(self, client):
+        for label in ["1 qt", "2 qt", "3 qt"]:
+            client.post("/api/pans", json={"name": "Pot", "weight_grams": 100, "capacity_label": label})
+        first = client.get("/api/pans", params={"limit": 2})
+        second = client.get("/api/pans", params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+        labels = [p["capacity_label"] for p in first.json() + second.json()]
+        assert sorted(labels) == ["1 qt", "2 qt", "3 qt"]
+
+    def test_name_prefix_filter(self, client):
+        self._seed(client, ["Sheet Pan", "Sheet Tray", "Skillet", "Pot"])
+        resp = client.get("/api/pans", params={"name_prefix": "She"})
+        assert [p["name"] for p in resp.json()] == ["Sheet Pan", "Sheet Tray"]
+
+    def test_capacity_label_filter(self, client):
+        client.post("/api/pans", json={"name": "Pot", "weight_grams": 100, "capacity_label": "6 L"})
+        client.post("/api/pans", json={"name": "Pan", "weight_grams": 100, "capacity_label": "Half"})
+        resp = client.get("/api/pans", params={"capacity_label": "6 L"})
+        assert [p["name"] for p in resp.json()] == ["Pot"]
+
+    def test_invalid_cursor(self, client):
+        resp = client.get("/api/pans", params={"cursor": "not-a-cursor"})
+        assert resp.status_code == 422
+
+    def test_limit_bounds(self, client):
+        assert client.get("/api/pans", params={"limit": 0}).status_code == 422
+        assert client.get("/api/pans", params={"limit": 1001}).status_code == 422
+
+
+class TestSearchPans:
+    def _seed(self, client):
+        for name, label in [("Sheet Pan", "Half"), ("Sheet Pan", "Quarter"), ("Skillet", "12-inch"), ("Stock Pot", "6 L")]:
+            client.post("/api/pans", json={"name": name, "weight_grams": 100, "capacity_label": label})
+
+    def test_prefix_match(self, client):
+        self._seed(client)
+        resp = client.get("/api/pans/search", params={"q": "she"})
+        assert resp.status_code == 200
+        assert [p["capacity_label"] for p in resp.json()] == ["Half", "Quarter"]
+
+    def test_all_terms_must_match(self, client):
+        self._seed(client)
+        resp = client.get("/api/pans/search", params={"q": "sheet quar"})
+        assert [(p["name"], p["capacity_label"]) for p in resp.json()] == [("Sheet Pan", "Quarter")]
+
+    def test_matches_capacity_label(self, client):
+        self._seed(client)
+        resp = client.get("/api/pans/search", params={"q": "12"})
+        assert [p["name"] for p in resp.json()] == ["Skillet"]
+
+    def test_limit(self, client):
+        self._seed(client)
+        resp = client.get("/api/pans/search", params={"q": "s", "limit": 2})
+        assert len(resp.json()) == 2
+
+    def test_punctuation_only_query(self, client):
+        self._seed(client)
+        resp = client.get("/api/pans/search", params={"q": '"*'})
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+    def test_index_follows_updates_and_deletes(self, client):
+        created = client.post("/api/pans", json={"name": "Wok", "weight_grams": 900}).json()
+        client.put(f"/api/pans/{created['id']}", json={"name": "Dutch Oven"})
+        assert client.get("/api/pans/search", params={"q": "wok"}).json() == []
+        assert [p["id"] for p in client.get("/api/pans/search", params={"q": "dutch"}).json()] == [created["id"]]
+        client.delete(f"/api/pans/{created['id']}")
+        assert client.get("/api/pans/search", params={"q": "dutch"}).json() == []
+
+    def test_query_required(self, client):
+        assert client.get("/api/pans/search").status_code == 422
+
+
+class TestImportPans:
+    def _import(self, client, body, content_type="text/csv", **params):
+        return client.post("/api/pans/import", content=body, headers={"content-type": content_type}, params=params)
+
+    def test_csv_creates_pans(self, client):
+        body = "name,weight_grams,capacity_label,notes\nSkillet,1200,,\nSheet Pan,500,Half,rimmed\n"
+        response = self._import(client, body)
+        assert response.status_code == 200
+        assert response.json() == {
+            "created": 2,
+            "updated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "issues": [],
+            "issues_truncated": False,
+        }
+        pans = {pan["name"]: pan for pan in client.get("/api/pans").json()}
+        assert pans["Sheet Pan"]["notes"] == "rimmed"
+        assert pans["Skillet"]["capacity_label"] == ""
+
+    def test_ndjson_updates_existing(self, client, sample_pan):
+        body = '{"name": "Sheet Pan", "weight_grams": 520, "capacity_label": "Half"}\n\n{"name": "Wok", "weight_grams": 900}\n'
+        response = self._import(client, body, "application/x-ndjson")
+        assert response.json()["created"] == 1
+        assert response.json()["updated"] == 1
+        pans = {pan["name"]: pan for pan in client.get("/api/pans").json()}
+        assert pans["Sheet Pan"]["id"] == sample_pan.id
+        assert pans["Sheet Pan"]["weight_grams"] == 520
+
+    def test_skip_reports_conflicts(self, client, sample_pan):
+        body = "name,weight_grams,capacity_label\nSheet Pan,520,Half\n"
+        data = self._import(client, body, on_conflict="skip").json()
+        assert data["skipped"] == 1
+        assert data["issues"] == [{"line": 2, "name": "Sheet Pan", "capacity_label": "Half", "error": "pan already exists"}]
+        assert client.get("/api/pans").json()[0]["weight_grams"] == 500
+
+    def test_invalid_rows_reported(self, client):
+        body = 'not json\n[1]\n{"name": "", "weight_grams": 10}\n{"name": "Pot", "weight_grams": 800}\n'
+        data = self._import(client, body, format="ndjson").json()
+        assert data["created"] == 1
+        assert data["failed"] == 3
+        assert [issue["line"] for issue in data["issues"]] == [1, 2, 3]
+        assert data["issues"][0]["error"].startswith("invalid JSON")
+        assert data["issues"][2]["error"].startswith("name:")
+
+    def test_repeated_key_keeps_last(self, client):
+        body = "name,weight_grams\nPot,800\nPot,820\n"
+        data = self._import(client, body).json()
+        assert data["created"] == 1
+        assert data["skipped"] == 1
+        assert data["issues"][0]["error"] == "superseded by line 3"
+        assert client.get("/api/pans").json()[0]["weight_grams"] == 820
+
+    def test_unknown_content_type(self, client):
+        assert self._import(client, "x", "application/octet-stream").status_code == 415
+
+    def test_missing_csv_columns(self, client):
+        response = self._import(client, "name,grams\nPot,800\n")
+        assert response.status_code == 422
+        assert "weight_grams" in response.json()["detail"]
+
+    def test_export_round_trip(self, client, sample_pan):
+        exported = client.get("/api/pans/export", params={"format": "csv"})
+        assert exported.status_code == 200
+        assert exported.headers["content-type"].startswith("text/csv")
+        assert exported.headers["content-disposition"] == 'attachment; filename="pans.csv"'
+        data = self._import(client, exported.content).json()
+        assert data["updated"] == 1
+        assert data["failed"] == 0
+
+
+class TestExportPans:
+    def test_ndjson_streams_every_pan(self, client, db):
+        from app.db_models import Pan
+
+        db.add_all(Pan(name=f"Pan {i:04d}", weight_grams=100 + i) for i in range(2500))
+        db.commit()
+        response = client.get("/api/pans/export")
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 2500
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+        assert set(rows[0]) == {"id", "name", "weight_grams", "capacity_label", "notes", "created_at", "updated_at"}
+
+    def test_empty_csv_has_header(self, client):
+        response = client.get("/api/pans/export", params={"format": "csv"})
+        assert response.text.strip() == "id,name,weight_grams,capacity_label,notes,created_at,updated_at"
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.db import Base, DbSession, _async_url, get_db_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import PanCreate  # noqa: E402
+from app.repositories import pans as pans_repo  # noqa: E402
+
+
+@pytest.fixture()
+def async_sessions(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(_async_url(url), poolclass=NullPool)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture()
+def async_client(async_sessions):
+    async def _override():
+        async with async_sessions() as session:
+            yield DbSession(session)
+
+    app.dependency_overrides[get_db_session] = _override
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+class TestAsyncUrl:
+    def test_sqlite(self):
+        assert _async_url("sqlite:///./carbsmart.db") == "sqlite+aiosqlite:///./carbsmart.db"
+
+    def test_postgres(self):
+        assert _async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+    def test_psycopg_unchanged(self):
+        assert _async_url("postgresql+psycopg://u:p@h/db") == "postgresql+psycopg://u:p@h/db"
+
+
+class TestDbSessionAsync:
+    def test_runs_repository_functions(self, async_sessions):
+        async def scenario():
+            async with async_sessions() as session:
+                db = DbSession(session)
+                assert db.is_async
+                pan = await db.run(pans_repo.create_pan, PanCreate(name="Wok", weight_grams=900))
+                found = await db.run(pans_repo.get_pan, pan.id)
+                return found.name, await db.run(pans_repo.count_pans)
+
+        assert asyncio.run(scenario()) == ("Wok", 1)
+
+    def test_sync_session_wrapper(self, db):
+        assert not DbSession(db).is_async
+        assert asyncio.run(DbSession(db).run(pans_repo.list_pans)) == []
+
+
+class TestAsyncRoutes:
+    def test_pan_crud_and_calc(self, async_client):
+        created = async_client.post("/api/pans", json={"name": "Sheet Pan", "weight_grams": 500})
+        assert created.status_code == 201
+        pan_id = created.json()["id"]
+
+        resp = async_client.post("/api/calc", json={"total_weight_grams": 1500, "pan_id": pan_id, "total_carbs": 100})
+        assert resp.status_code == 200
+        assert resp.json()["servings"] == 4
+
+        assert async_client.put(f"/api/pans/{pan_id}", json={"name": "Renamed"}).json()["name"] == "Renamed"
+        assert async_client.delete(f"/api/pans/{pan_id}").status_code == 204
+        assert async_client.get("/api/pans").json() == []
+
+    def test_duplicate_rolls_back(self, async_client):
+        async_client.post("/api/pans", json={"name": "Pot", "weight_grams": 500})
+        resp = async_client.post("/api/pans", json={"name": "Pot", "weight_grams": 600})
+        assert resp.status_code == 409
+
+    def test_web_pages(self, async_client):
+        async_client.post("/pans", data={"name": "Skillet", "weight_grams": 1200})
+        assert "Skillet" in async_client.get("/pans").text
+        assert "Skillet" in async_client.get("/calc").text
+
+    def test_import_and_export(self, async_client):
+        body = "name,weight_grams\n" + "".join(f"Pan {i},{100 + i}\n" for i in range(1500))
+        resp = async_client.post("/api/pans/import", content=body, headers={"content-type": "text/csv"})
+        assert resp.json()["created"] == 1500
+        lines = async_client.get("/api/pans/export").text.splitlines()
+        assert len(lines) == 1500
@@ -1,6 +1,8 @@
 import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
 
-from app.services.calc import calculate_plan, choose_servings
+from app.services.calc import _choose_servings_linear, calculate_plan, choose_servings
 
 
 class TestChooseServings:
@@ -70,6 +72,50 @@ class TestChooseServings:
         servings, _ = choose_servings(1305, 200, 300)
         assert isinstance(servings, int)
 
+    def test_large_batch_with_tiny_target(self):
+        # 40 kg commissary pan split into ~1 g portions
+        servings, weight = choose_servings(40000, 0.9, 1.1)
+        assert servings == 40000
+        assert weight == 1.0
+
+
+_weights = st.floats(min_value=0.01, max_value=50000, allow_nan=False, allow_infinity=False)
+_targets = st.floats(min_value=0.5, max_value=5000, allow_nan=False, allow_infinity=False)
+
+
+class TestChooseServingsMatchesLinearScan:
+    @settings(max_examples=500, deadline=None)
+    @given(net=_weights, a=_targets, b=_targets)
+    def test_random_inputs(self, net, a, b):
+        lo, hi = min(a, b), max(a, b)
+        assert choose_servings(net, lo, hi) == _choose_servings_linear(net, lo, hi)
+
+    @settings(max_examples=300, deadline=None)
+    @given(
+        net=st.integers(min_value=1, max_value=20000),
+        lo=st.integers(min_value=1, max_value=500),
+        width=st.integers(min_value=0, max_value=500),
+    )
+    def test_integer_inputs(self, net, lo, width):
+        # Whole-gram inputs hit exact boundaries and midpoint ties most often
+        assert choose_servings(net, lo, lo + width) == _choose_servings_linear(net, lo, lo + width)
+
+    @pytest.mark.parametrize(
+        "net, lo, hi",
+        [
+            (1000, 200, 300),
+            (1000, 250, 250),
+            (150, 200, 300),
+            (600, 100, 200),
+            (500, 200, 300),
+            (450, 200, 250),
+            (1e-3, 200, 300),
+            (40000, 1, 3),
+        ],
+    )
+    def test_boundaries_and_ties(self, net, lo, hi):
+        assert choose_servings(net, lo, hi) == _choose_servings_linear(net, lo, hi)
+
 
 class TestCalculatePlan:
     def test_basic_calculation(self):
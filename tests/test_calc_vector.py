@@ -0,0 +1,86 @@
+import math
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+np = pytest.importorskip("numpy")
+
+from app.services.calc import calculate_plan  # noqa: E402
+from app.services.calc_vector import calculate_plans  # noqa: E402
+
+
+def _scalar_rows(total, pan, carbs, lo, hi, forced):
+    rows = []
+    for args in zip(total, pan, carbs, lo, hi, forced):
+        *plan_args, target = args
+        try:
+            rows.append(calculate_plan(*plan_args, target or None))
+        except ValueError:
+            rows.append(None)
+    return rows
+
+
+def _assert_matches(total, pan, carbs, lo, hi, forced):
+    net, servings, weight, per_serving, ok = calculate_plans(total, pan, carbs, lo, hi, forced)
+    for i, expected in enumerate(_scalar_rows(total, pan, carbs, lo, hi, forced)):
+        if expected is None:
+            assert not ok[i]
+            assert servings[i] == 0
+            assert math.isnan(net[i]) and math.isnan(weight[i]) and math.isnan(per_serving[i])
+        else:
+            assert ok[i]
+            assert (net[i], servings[i], weight[i], per_serving[i]) == expected
+
+
+class TestCalculatePlans:
+    def test_matches_basic_scalar_cases(self):
+        _assert_matches(
+            total=[1500, 1500, 3545, 500, 1000],
+            pan=[500, 500, 2240, 500, 200],
+            carbs=[100, 100, 230, 100, 0],
+            lo=[200, 200, 200, 200, 200],
+            hi=[300, 300, 300, 300, 300],
+            forced=[0, 2, 0, 0, 0],
+        )
+
+    def test_invalid_rows_masked(self):
+        net, servings, weight, per_serving, ok = calculate_plans(
+            [300, 1500, 1500, 1500],
+            [500, 500, 500, 500],
+            [100, 100, 100, 100],
+            [200, 400, 0, 400],
+            [300, 200, 300, 200],
+            [0, 0, 0, 2],
+        )
+        assert ok.tolist() == [False, False, False, True]
+        assert servings.tolist() == [0, 0, 0, 2]
+        assert weight[3] == 500.0
+
+    def test_broadcasts_scalar_targets(self):
+        net, servings, weight, per_serving, ok = calculate_plans([1500, 2500], 500, [100, 200], 200, 300)
+        assert servings.tolist() == [4, 8]
+        assert per_serving.tolist() == [25.0, 25.0]
+        assert ok.all()
+
+    def test_empty_input(self):
+        net, servings, weight, per_serving, ok = calculate_plans([], [], [], [], [])
+        assert net.shape == servings.shape == ok.shape == (0,)
+
+    @settings(max_examples=200, deadline=None)
+    @given(
+        rows=st.lists(
+            st.tuples(
+                st.floats(min_value=0.5, max_value=40000, allow_nan=False),
+                st.floats(min_value=0, max_value=3000, allow_nan=False),
+                st.floats(min_value=0, max_value=500, allow_nan=False),
+                st.floats(min_value=0.5, max_value=600, allow_nan=False),
+                st.floats(min_value=0.5, max_value=600, allow_nan=False),
+                st.integers(min_value=0, max_value=12),
+            ),
+            min_size=1,
+            max_size=40,
+        )
+    )
+    def test_matches_scalar_row_by_row(self, rows):
+        _assert_matches(*(list(column) for column in zip(*rows)))
@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import serialization
+from app.api.responses import FastJSONResponse
+from app.compression import CompressionMiddleware, accepts_encoding
+from app.serialization import dumps
+
+BIG = "carbs " * 1000
+
+
+@pytest.fixture()
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BIG.encode()), headers={"content-encoding": "gzip"}, media_type="text/plain")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG, BIG]), media_type="text/plain")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter([BIG]), media_type="text/event-stream")
+
+    with TestClient(app) as client:
+        yield client
+
+
+def _raw(client, path, accept):
+    # Read the undecoded body so the test sees what goes over the wire.
+    with client.stream("GET", path, headers={"accept-encoding": accept}) as resp:
+        return resp, b"".join(resp.iter_raw())
+
+
+class TestCompressionMiddleware:
+    def test_prefers_brotli(self, compressed_client):
+        brotli = pytest.importorskip("brotli")
+        resp, body = _raw(compressed_client, "/big", "gzip, br")
+        assert resp.headers["content-encoding"] == "br"
+        assert brotli.decompress(body).decode() == BIG
+        assert "accept-encoding" in resp.headers["vary"].lower()
+
+    def test_gzip(self, compressed_client):
+        resp, body = _raw(compressed_client, "/big", "gzip")
+        assert resp.headers["content-encoding"] == "gzip"
+        assert int(resp.headers["content-length"]) == len(body) < len(BIG)
+        assert gzip.decompress(body).decode() == BIG
+
+    def test_streamed_gzip(self, compressed_client):
+        resp, body = _raw(compressed_client, "/stream", "gzip")
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        assert gzip.decompress(body).decode() == BIG * 2
+
+    def test_event_stream_untouched(self, compressed_client):
+        resp, body = _raw(compressed_client, "/events", "gzip")
+        assert "content-encoding" not in resp.headers
+        assert body.decode() == BIG
+
+    def test_below_threshold_untouched(self, compressed_client):
+        resp, body = _raw(compressed_client, "/small", "gzip, br")
+        assert "content-encoding" not in resp.headers
+        assert body == b"ok"
+
+    def test_identity_when_not_accepted(self, compressed_client):
+        resp, body = _raw(compressed_client, "/big", "br;q=0, identity")
+        assert "content-encoding" not in resp.headers
+        assert body.decode() == BIG
+
+    def test_already_encoded_passes_through(self, compressed_client):
+        resp, body = _raw(compressed_client, "/encoded", "br")
+        assert resp.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body).decode() == BIG
+
+    def test_accept_parsing(self):
+        assert accepts_encoding("gzip;q=0.5, br", "br")
+        assert not accepts_encoding("gzip;q=0", "gzip")
+        assert not accepts_encoding("gzipx", "gzip")
+
+
+class TestFastJSON:
+    def test_orjson_and_stdlib_agree(self, monkeypatch):
+        content = {"name": "Sheet Pan", "weight_grams": 500.5, "tags": ["Half", "Ü"]}
+        fast = dumps(content)
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert dumps(content) == fast
+
+    def test_response_class(self):
+        assert FastJSONResponse({"a": 1}).body == b'{"a":1}'
+
+
+class TestApiPayloads:
+    def test_list_pans_is_json(self, client, sample_pan):
+        resp = client.get("/api/pans")
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json()[0]["name"] == "Sheet Pan"
+
+    def test_batch_is_json(self, client, sample_pan):
+        resp = client.post(
+            "/api/calc/batch",
+            json=[{"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 120}],
+        )
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json()["items"][0]["status_code"] == 200
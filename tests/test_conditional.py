@@ -0,0 +1,83 @@
+class TestConditionalPanList:
+    def test_etag_and_304(self, client, sample_pan):
+        first = client.get("/api/pans")
+        etag = first.headers["etag"]
+        assert first.headers["last-modified"]
+        resp = client.get("/api/pans", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_write_changes_etag(self, client, sample_pan):
+        etag = client.get("/api/pans").headers["etag"]
+        client.put(f"/api/pans/{sample_pan.id}", json={"weight_grams": 650})
+        resp = client.get("/api/pans", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_rename_within_same_second_changes_etag(self, client):
+        first = client.post("/api/pans", json={"name": "Pan A", "weight_grams": 500}).json()
+        client.post("/api/pans", json={"name": "Pan B", "weight_grams": 700})
+        etag = client.get("/api/pans").headers["etag"]
+        # Count, total weight and the second-resolution updated_at can all stay put.
+        client.put(f"/api/pans/{first['id']}", json={"name": "Renamed"})
+        resp = client.get("/api/pans", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert "Renamed" in {pan["name"] for pan in resp.json()}
+
+    def test_write_outside_repository_changes_etag(self, client, db, sample_pan):
+        from sqlalchemy import text
+
+        etag = client.get("/api/pans").headers["etag"]
+        # Another worker or a manual fix: nothing clears this process's caches.
+        db.execute(text("UPDATE pans SET notes = 'edited elsewhere' WHERE id = :id"), {"id": sample_pan.id})
+        db.commit()
+        resp = client.get("/api/pans", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_asset_or_template_change_changes_etag(self, client, sample_pan, monkeypatch):
+        from app import conditional
+        from app.web.static import assets
+
+        etag = client.get("/api/pans").headers["etag"]
+        monkeypatch.setattr(assets, "digest", "0" * 12)
+        after_assets = client.get("/api/pans", headers={"If-None-Match": etag})
+        assert after_assets.status_code == 200
+        monkeypatch.setattr(conditional, "templates_fingerprint", lambda: "edited")
+        after_templates = client.get("/api/pans").headers["etag"]
+        assert len({etag, after_assets.headers["etag"], after_templates}) == 3
+
+    def test_query_changes_etag(self, client, sample_pan):
+        all_pans = client.get("/api/pans").headers["etag"]
+        filtered = client.get("/api/pans", params={"name_prefix": "Sheet"}).headers["etag"]
+        assert all_pans != filtered
+
+    def test_stale_etag_gets_full_response(self, client, sample_pan):
+        resp = client.get("/api/pans", headers={"If-None-Match": 'W/"stale"'})
+        assert resp.status_code == 200
+        assert resp.json()[0]["name"] == "Sheet Pan"
+
+
+class TestConditionalPages:
+    def test_pans_page_304(self, client, sample_pan):
+        etag = client.get("/pans").headers["etag"]
+        assert client.get("/pans", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_calc_page_304(self, client, sample_pan):
+        etag = client.get("/calc").headers["etag"]
+        assert client.get("/calc", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_mini_view_304_until_pan_edited(self, client, sample_pan):
+        params = {"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 100, "view": "mini"}
+        etag = client.get("/calc", params=params).headers["etag"]
+        assert client.get("/calc", params=params, headers={"If-None-Match": etag}).status_code == 304
+        client.put(f"/api/pans/{sample_pan.id}", json={"weight_grams": 700})
+        resp = client.get("/calc", params=params, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert "800.0" in resp.text
+
+    def test_error_pages_have_no_etag(self, client, sample_pan):
+        resp = client.get("/calc", params={"pan_id": 9999, "total_weight_grams": 1500, "total_carbs": 100})
+        assert resp.status_code == 404
+        assert "etag" not in resp.headers
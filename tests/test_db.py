@@ -0,0 +1,250 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_mock_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateTable
+
+from app import db as app_db
+from app.db import (
+    SQLITE_PRAGMAS,
+    Base,
+    RoutingSession,
+    SchemaOutOfDate,
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    _async_engines,
+    _engine_kwargs,
+    _is_memory_sqlite,
+    check_schema,
+    create_app_engine,
+    create_async_app_engine,
+    db_pool_stats,
+    migration_heads,
+    pool_stats,
+)
+from app.db_models import Pan
+from app.models import PanCreate, PanUpdate
+from app.repositories import pans as pans_repo
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+class TestSqliteTuning:
+    def test_file_database_profile(self, tmp_path):
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+        try:
+            assert _pragma(engine, "journal_mode") == "wal"
+            assert _pragma(engine, "synchronous") == 1  # NORMAL
+            assert _pragma(engine, "busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+            assert _pragma(engine, "cache_size") == SQLITE_PRAGMAS["cache_size"]
+            assert isinstance(engine.pool, QueuePool)
+        finally:
+            engine.dispose()
+
+    def test_memory_database_skips_wal(self):
+        engine = create_app_engine("sqlite://")
+        try:
+            assert _pragma(engine, "journal_mode") == "memory"
+            assert _pragma(engine, "busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+        finally:
+            engine.dispose()
+
+    def test_every_pooled_connection_tuned(self, tmp_path):
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        try:
+            with engine.connect() as first, engine.connect() as second:
+                for conn in (first, second):
+                    assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_PRAGMAS["busy_timeout"]
+        finally:
+            engine.dispose()
+
+    def test_memory_detection(self):
+        assert _is_memory_sqlite("sqlite://")
+        assert _is_memory_sqlite("sqlite:///:memory:")
+        assert not _is_memory_sqlite("sqlite:///./carbsmart.db")
+
+
+class TestPoolConfiguration:
+    def test_server_database_pool_settings(self):
+        kwargs = _engine_kwargs("postgresql+psycopg://u:p@h/db")
+        assert kwargs["poolclass"] is TimedQueuePool
+        assert kwargs["pool_pre_ping"] is True
+        assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= kwargs.keys()
+
+    def test_checkout_wait_metrics(self, tmp_path):
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+        try:
+            for _ in range(3):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            stats = pool_stats(engine)
+            assert stats["checkouts"] == 3
+            assert stats["timeouts"] == 0
+            assert stats["wait_seconds_total"] >= 0
+            assert stats["checked_out"] == 0
+        finally:
+            engine.dispose()
+
+    def test_async_engine_pool_settings_and_metrics(self, tmp_path, monkeypatch):
+        assert _engine_kwargs("postgresql+asyncpg://u:p@h/db", is_async=True)["poolclass"] is TimedAsyncAdaptedQueuePool
+        pytest.importorskip("aiosqlite")
+        engine = create_async_app_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+
+        async def scenario():
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            await engine.dispose()
+
+        asyncio.run(scenario())
+        assert isinstance(engine.sync_engine.pool, TimedAsyncAdaptedQueuePool)
+        monkeypatch.setitem(_async_engines, "async_primary", engine)
+        stats = db_pool_stats()["async_primary"]
+        assert stats["checkouts"] == 3
+        assert stats["checked_out"] == 0
+
+
+# The pans table as the pre-Alembic create_all boot built it.
+LEGACY_PANS_DDL = """
+CREATE TABLE pans (
+    id INTEGER NOT NULL,
+    name VARCHAR(200) NOT NULL,
+    weight_grams FLOAT NOT NULL,
+    capacity_label VARCHAR(100) DEFAULT '' NOT NULL,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_pans_name_capacity UNIQUE (name, capacity_label)
+)
+"""
+
+
+class TestMigrations:
+    def test_upgrade_adopts_unversioned_database(self, tmp_path, monkeypatch):
+        url = f"sqlite:///{tmp_path / 'legacy.db'}"
+        engine = create_app_engine(url)
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(LEGACY_PANS_DDL)
+                conn.exec_driver_sql("INSERT INTO pans (name, weight_grams, capacity_label) VALUES ('Sheet Pan', 500, 'Half')")
+            monkeypatch.setattr(app_db, "DATABASE_URL", url)
+            config = Config()
+            config.set_main_option("script_location", str(Path(__file__).resolve().parent.parent / "alembic"))
+            command.upgrade(config, "head")
+            check_schema(engine)
+            with sessionmaker(bind=engine)() as db:
+                assert [pan.name for pan in pans_repo.search_pans(db, "sheet", 10)] == ["Sheet Pan"]
+        finally:
+            engine.dispose()
+
+
+class TestCreateAll:
+    def test_postgres_trigger_replaced_on_repeat(self):
+        statements = []
+        engine = create_mock_engine("postgresql+psycopg://", lambda sql, *args, **kwargs: statements.append(str(sql)))
+        Base.metadata.create_all(engine, checkfirst=False)
+        triggers = [sql.strip() for sql in statements if "TRIGGER" in sql and "pans_catalog_revision" in sql]
+        assert [sql.split(" TRIGGER")[0] for sql in triggers] == ["DROP", "CREATE"]
+
+    def test_adds_search_index_to_existing_pans(self):
+        engine = create_app_engine("sqlite://")
+        try:
+            # A pans table from before search existed: plain DDL, no create events.
+            with engine.begin() as conn:
+                conn.execute(CreateTable(Pan.__table__))
+                conn.execute(Pan.__table__.insert().values(name="Sheet Pan", weight_grams=500, capacity_label="Half"))
+            Base.metadata.create_all(engine)
+            Base.metadata.create_all(engine)
+            with sessionmaker(bind=engine)() as db:
+                assert [pan.name for pan in pans_repo.search_pans(db, "sheet", 10)] == ["Sheet Pan"]
+        finally:
+            engine.dispose()
+
+
+@pytest.fixture()
+def primary_and_replica(tmp_path):
+    primary = create_app_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_app_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    # Seed the replica alone so reads can be told apart from primary reads.
+    with sessionmaker(bind=replica)() as seed:
+        seed.add(Pan(id=1, name="Replica Pan", weight_grams=500))
+        seed.commit()
+    Session = sessionmaker(
+        bind=primary, class_=RoutingSession, replica_bind=replica, expire_on_commit=False
+    )
+    yield Session, primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+class TestReplicaRouting:
+    def test_reads_go_to_replica(self, primary_and_replica):
+        Session, _, _ = primary_and_replica
+        with Session() as db:
+            assert [p.name for p in pans_repo.list_pans(db)] == ["Replica Pan"]
+            assert pans_repo.get_pan(db, 1).name == "Replica Pan"
+            assert list(pans_repo.get_pans_by_ids(db, [1])) == [1]
+
+    def test_writes_go_to_primary(self, primary_and_replica):
+        Session, primary, _ = primary_and_replica
+        with Session() as db:
+            pan = pans_repo.create_pan(db, PanCreate(name="Primary Pan", weight_grams=700))
+            assert pan.id is not None
+        with sessionmaker(bind=primary)() as check:
+            assert [p.name for p in pans_repo.list_pans(check)] == ["Primary Pan"]
+
+    def test_session_reads_own_writes(self, primary_and_replica):
+        Session, _, _ = primary_and_replica
+        with Session() as db:
+            pan = pans_repo.create_pan(db, PanCreate(name="Primary Pan", weight_grams=700))
+            assert [p.name for p in pans_repo.list_pans(db)] == ["Primary Pan"]
+            updated = pans_repo.update_pan(db, pan.id, PanUpdate(weight_grams=710))
+            assert updated.weight_grams == 710
+
+    def test_both_pools_report_checkouts(self, primary_and_replica):
+        Session, primary, replica = primary_and_replica
+        with Session() as db:
+            pans_repo.list_pans(db)
+            pans_repo.create_pan(db, PanCreate(name="Primary Pan", weight_grams=700))
+        assert pool_stats(replica)["checkouts"] >= 1
+        assert pool_stats(primary)["checkouts"] >= 1
+
+
+class TestSchemaCheck:
+    @pytest.fixture()
+    def engine(self, tmp_path):
+        engine = create_app_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+        yield engine
+        engine.dispose()
+
+    def _stamp(self, engine, revision):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            conn.execute(text("INSERT INTO alembic_version VALUES (:rev)"), {"rev": revision})
+
+    def test_heads_from_migrations(self):
+        assert migration_heads() == {"20261018_0007"}
+
+    def test_at_head_passes(self, engine):
+        self._stamp(engine, "20261018_0007")
+        check_schema(engine)
+
+    def test_behind_fails(self, engine):
+        self._stamp(engine, "20261018_0002")
+        with pytest.raises(SchemaOutOfDate, match="20261018_0002"):
+            check_schema(engine)
+
+    def test_unmigrated_fails(self, engine):
+        with pytest.raises(SchemaOutOfDate, match="no Alembic revision"):
+            check_schema(engine)
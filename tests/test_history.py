@@ -0,0 +1,196 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db import get_db
+from app.db_models import WeighIn
+from app.history import BufferedWriter, record_weigh_in, weigh_in_log
+from app.main import app
+from app.repositories import weigh_ins as weigh_ins_repo
+from app.write_behind import write_behind
+
+
+@pytest.fixture()
+def history(sessions, monkeypatch):
+    monkeypatch.setattr(weigh_in_log, "enabled", True)
+    monkeypatch.setattr(weigh_in_log, "session_factory", sessions)
+    return weigh_in_log
+
+
+class TestBufferedWriter:
+    def test_buffers_until_flush(self, db, sessions, weigh_in_row, count_rows):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, session_factory=sessions)
+        writer.record(weigh_in_row())
+        writer.record(weigh_in_row())
+        assert count_rows(WeighIn) == 0
+        assert writer.flush() == 2
+        assert count_rows(WeighIn) == 2
+        assert writer.stats()["written"] == 2
+
+    def test_flushes_when_batch_is_full(self, db, sessions, weigh_in_row, count_rows):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, batch_size=3, flush_seconds=60, session_factory=sessions)
+        writer.start()
+        try:
+            for _ in range(3):
+                writer.record(weigh_in_row())
+            deadline = time.monotonic() + 5
+            while writer.written < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.stop()
+        assert count_rows(WeighIn) == 3
+
+    def test_flushes_on_interval(self, db, sessions, weigh_in_row, count_rows):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, flush_seconds=0.05, session_factory=sessions)
+        writer.start()
+        try:
+            writer.record(weigh_in_row())
+            deadline = time.monotonic() + 5
+            while writer.written < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.stop()
+        assert count_rows(WeighIn) == 1
+
+    def test_stop_drains_buffer(self, db, sessions, weigh_in_row, count_rows):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, flush_seconds=60, session_factory=sessions)
+        writer.start()
+        writer.record(weigh_in_row())
+        writer.stop()
+        assert count_rows(WeighIn) == 1
+        assert writer.stats()["running"] is False
+
+    def test_failed_flush_is_retried(self, db, sessions, weigh_in_row):
+        calls = []
+
+        def write(session, rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+            weigh_ins_repo.insert_weigh_ins(session, rows)
+
+        writer = BufferedWriter(write, session_factory=sessions)
+        writer.record(weigh_in_row())
+        assert writer.flush() == 0
+        writer.record(weigh_in_row())
+        assert writer.flush() == 2
+        assert calls == [1, 2]
+        assert writer.stats()["failed_flushes"] == 1
+
+    def test_drops_oldest_past_max_pending(self, db, sessions, weigh_in_row):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, max_pending=2, session_factory=sessions)
+        for pan_id in (1, 2, 3):
+            writer.record(weigh_in_row(pan_id=pan_id))
+        assert writer.stats()["pending"] == 2
+        assert writer.stats()["dropped"] == 1
+        writer.flush()
+        assert sorted(db.scalars(select(WeighIn.pan_id))) == [2, 3]
+
+    def test_disabled_records_nothing(self, sessions, weigh_in_row):
+        writer = BufferedWriter(weigh_ins_repo.insert_weigh_ins, enabled=False, session_factory=sessions)
+        writer.record(weigh_in_row())
+        assert writer.stats()["pending"] == 0
+
+
+class TestListWeighIns:
+    def test_filters_by_pan_and_window(self, db, weigh_in_row):
+        now = datetime.now(UTC)
+        weigh_ins_repo.insert_weigh_ins(
+            db,
+            [
+                weigh_in_row(pan_id=1, recorded_at=now - timedelta(days=2)),
+                weigh_in_row(pan_id=1, recorded_at=now - timedelta(hours=1)),
+                weigh_in_row(pan_id=2, recorded_at=now - timedelta(hours=1)),
+            ],
+        )
+        assert len(weigh_ins_repo.list_weigh_ins(db, 10)) == 3
+        assert len(weigh_ins_repo.list_weigh_ins(db, 10, pan_id=1)) == 2
+        recent = weigh_ins_repo.list_weigh_ins(db, 10, pan_id=1, since=now - timedelta(days=1))
+        assert len(recent) == 1
+        assert len(weigh_ins_repo.list_weigh_ins(db, 10, until=now - timedelta(days=1))) == 1
+
+    def test_newest_first(self, db, weigh_in_row):
+        now = datetime.now(UTC)
+        weigh_ins_repo.insert_weigh_ins(db, [weigh_in_row(recorded_at=now - timedelta(minutes=minutes)) for minutes in (5, 1, 3)])
+        rows = weigh_ins_repo.list_weigh_ins(db, 10)
+        assert [row.recorded_at for row in rows] == sorted((row.recorded_at for row in rows), reverse=True)
+
+
+class TestRecordedRoutes:
+    def test_api_calc_is_recorded(self, client, db, sample_pan, history, count_rows):
+        body = {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100}
+        assert client.post("/api/calc", json=body).status_code == 200
+        assert client.post("/api/calc/batch", json=[body, {**body, "pan_id": 9999}]).status_code == 200
+        assert count_rows(WeighIn) == 0
+        history.flush()
+        rows = client.get("/api/weigh-ins").json()
+        assert len(rows) == 2
+        assert rows[0]["source"] == "api"
+        assert rows[0]["pan_weight_grams"] == 500
+        assert rows[0]["servings"] == 4
+
+    def test_web_submit_is_recorded(self, client, sample_pan, history):
+        form = {"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 100}
+        client.post("/calc", data=form)
+        client.get("/calc", params={**form, "view": "mini"})
+        history.flush()
+        rows = client.get("/api/weigh-ins", params={"pan_id": sample_pan.id}).json()
+        assert [row["source"] for row in rows] == ["web"]
+
+    def test_failed_calculation_not_recorded(self, client, sample_pan, history):
+        body = {"total_weight_grams": 100, "pan_id": sample_pan.id, "total_carbs": 100}
+        assert client.post("/api/calc", json=body).status_code == 422
+        assert history.stats()["pending"] == 0
+
+    def test_app_writer_uses_get_db_override(self, sessions, sample_pan, monkeypatch, count_rows):
+        monkeypatch.setattr(weigh_in_log, "enabled", True)
+        monkeypatch.setattr(weigh_in_log, "session_factory", weigh_in_log.session_factory)
+
+        def _override():
+            with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _override
+        try:
+            with TestClient(app) as client:
+                body = {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100}
+                assert client.post("/api/calc", json=body).status_code == 200
+        finally:
+            app.dependency_overrides.clear()
+        # Shutdown flushed the row through the override, not the global engine.
+        assert count_rows(WeighIn) == 1
+
+    def test_rows_recorded_during_write_behind_shutdown_are_flushed(
+        self, sessions, sample_pan, monkeypatch, count_rows
+    ):
+        from app import main
+
+        monkeypatch.setattr(main, "WRITE_BEHIND", True)
+        monkeypatch.setattr(weigh_in_log, "enabled", True)
+        monkeypatch.setattr(weigh_in_log, "session_factory", weigh_in_log.session_factory)
+        monkeypatch.setattr(write_behind, "session_factory", write_behind.session_factory)
+        stop = write_behind.stop
+
+        async def stop_then_late_request():
+            await stop()
+            record_weigh_in("api", sample_pan, 1500, 100, 200, 300, None, (1000, 4, 250, 25))
+
+        monkeypatch.setattr(write_behind, "stop", stop_then_late_request)
+
+        def _override():
+            with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _override
+        try:
+            with TestClient(app):
+                pass
+        finally:
+            app.dependency_overrides.clear()
+        assert count_rows(WeighIn) == 1
+
+    def test_health_reports_writer(self, client):
+        assert client.get("/health").json()["weigh_in_log"]["enabled"] is False
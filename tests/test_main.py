@@ -0,0 +1,22 @@
+class TestRootRedirect:
+    def test_redirects_to_pans_when_empty(self, client):
+        resp = client.get("/", follow_redirects=False)
+        assert resp.status_code == 303
+        assert resp.headers["location"] == "/pans"
+
+    def test_redirects_to_calc_with_pans(self, client, sample_pan):
+        resp = client.get("/", follow_redirects=False)
+        assert resp.status_code == 303
+        assert resp.headers["location"] == "/calc"
+
+    def test_first_pan_switches_target(self, client):
+        assert client.get("/", follow_redirects=False).headers["location"] == "/pans"
+        client.post("/api/pans", json={"name": "Skillet", "weight_grams": 1200})
+        assert client.get("/", follow_redirects=False).headers["location"] == "/calc"
+
+
+class TestHealth:
+    def test_health(self, client):
+        resp = client.get("/health")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "ok"
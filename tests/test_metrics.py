@@ -0,0 +1,76 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.metrics import Histogram, MetricsMiddleware
+
+
+def _series(histogram):
+    return histogram.snapshot()
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_in_output(self):
+        histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(5.0, "/a")
+        lines = histogram.render()
+        assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{route="/a"} 3' in lines
+        assert 'test_seconds_sum{route="/a"} 5.55' in lines
+
+    def test_label_values_escaped(self):
+        histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(1.0,))
+        histogram.observe(0.1, 'a"b')
+        assert 'test_seconds_count{route="a\\"b"} 1' in histogram.render()
+
+
+class TestMetricsEndpoint:
+    def test_prometheus_text(self, client):
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE carbsmart_http_request_duration_seconds histogram" in resp.text
+
+    def test_route_latency_uses_template(self, client, sample_pan):
+        client.put(f"/api/pans/{sample_pan.id}", json={"notes": "Dark"})
+        labels = set(_series(metrics.request_seconds))
+        assert ("PUT", "/api/pans/{pan_id}", "200") in labels
+
+    def test_route_label_ignores_param_values(self):
+        router = APIRouter(prefix="/units")
+        router.add_api_route("/{unit}/units", lambda unit: unit)
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(MetricsMiddleware)
+        TestClient(app).get("/units/units/units")
+        assert ("GET", "/units/{unit}/units", "200") in set(_series(metrics.request_seconds))
+
+    def test_mount_labelled_by_mount_point(self, client):
+        client.get("/static/no-such-file.css")
+        labels = {route for _, route, _ in _series(metrics.request_seconds)}
+        assert "/static/{path}" in labels
+
+    def test_unmatched_route(self, client):
+        client.get("/no/such/page")
+        assert ("GET", "unmatched", "404") in set(_series(metrics.request_seconds))
+
+    def test_db_queries_counted_per_request(self, client, sample_pan):
+        client.get("/api/pans")
+        counts, _ = _series(metrics.request_db_queries)[("GET", "/api/pans")]
+        assert sum(counts) == 1
+        # The one observation is a non-zero query count.
+        assert counts[0] == 0
+        assert _series(metrics.db_query_seconds)
+
+    def test_template_and_calculate_timed(self, client, sample_pan):
+        client.post(
+            "/calc",
+            data={"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 120},
+        )
+        assert ("calc/page.html",) in _series(metrics.template_render_seconds)
+        counts, _ = _series(metrics.calculate_plan_seconds)[()]
+        assert sum(counts) == 1
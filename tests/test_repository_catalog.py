@@ -0,0 +1,87 @@
+from app.models import PanCreate, PanUpdate
+from app.repositories import pans as pans_repo
+from app.repositories.catalog import PanCatalog, pan_catalog
+
+
+class TestPanCatalog:
+    def test_second_read_is_a_hit(self, db, sample_pan):
+        first = pan_catalog.list_pans(db)
+        second = pan_catalog.list_pans(db)
+        assert [p.id for p in first] == [p.id for p in second] == [sample_pan.id]
+        assert pan_catalog.stats()["misses"] == 1
+        assert pan_catalog.stats()["hits"] == 1
+
+    def test_get_pan_from_snapshot(self, db, sample_pan):
+        pan_catalog.list_pans(db)
+        pan = pan_catalog.get_pan(db, sample_pan.id)
+        assert pan.name == "Sheet Pan"
+        assert pan.capacity_label == "Half"
+        assert pan_catalog.stats()["hits"] == 1
+
+    def test_get_missing_pan(self, db):
+        assert pan_catalog.get_pan(db, 9999) is None
+
+    def test_create_invalidates(self, db, sample_pan):
+        pan_catalog.list_pans(db)
+        version = pan_catalog.version
+        pans_repo.create_pan(db, PanCreate(name="Alpha", weight_grams=100))
+        assert pan_catalog.version == version + 1
+        assert [p.name for p in pan_catalog.list_pans(db)] == ["Alpha", "Sheet Pan"]
+
+    def test_update_invalidates(self, db, sample_pan):
+        pan_catalog.list_pans(db)
+        pans_repo.update_pan(db, sample_pan.id, PanUpdate(weight_grams=750))
+        assert pan_catalog.get_pan(db, sample_pan.id).weight_grams == 750
+
+    def test_delete_invalidates(self, db, sample_pan):
+        pan_catalog.list_pans(db)
+        pans_repo.delete_pan(db, sample_pan.id)
+        assert pan_catalog.list_pans(db) == []
+
+    def test_pan_added_outside_repository_found_by_id(self, db, sample_pan):
+        from app.db_models import Pan
+
+        pan_catalog.list_pans(db)
+        other = Pan(name="Wok", weight_grams=900)
+        db.add(other)
+        db.commit()
+        assert pan_catalog.get_pan(db, other.id).name == "Wok"
+        assert [p.name for p in pan_catalog.list_pans(db)] == ["Sheet Pan", "Wok"]
+
+    def test_derived_memoized_per_version(self, db, sample_pan):
+        calls = []
+
+        def build(pans):
+            calls.append(1)
+            return [p.name for p in pans]
+
+        assert pan_catalog.derived(db, "names", build) == ["Sheet Pan"]
+        assert pan_catalog.derived(db, "names", build) == ["Sheet Pan"]
+        assert len(calls) == 1
+        pan_catalog.invalidate()
+        pan_catalog.derived(db, "names", build)
+        assert len(calls) == 2
+
+    def test_zero_ttl_disables_cache(self, db, sample_pan):
+        catalog = PanCatalog(ttl_seconds=0)
+        catalog.list_pans(db)
+        catalog.list_pans(db)
+        assert catalog.hits == 0
+        assert catalog.misses == 2
+
+
+class TestCalcPageUsesCatalog:
+    def test_repeat_requests_hit_cache(self, client, sample_pan):
+        params = {"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 100}
+        client.get("/calc", params=params)
+        after_first = pan_catalog.stats()
+        client.get("/calc", params=params)
+        after_second = pan_catalog.stats()
+        assert after_second["misses"] == after_first["misses"]
+        assert after_second["hits"] > after_first["hits"]
+
+    def test_edit_visible_immediately(self, client, sample_pan):
+        params = {"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 100, "view": "mini"}
+        assert "1000.0" in client.get("/calc", params=params).text
+        client.put(f"/api/pans/{sample_pan.id}", json={"weight_grams": 700})
+        assert "800.0" in client.get("/calc", params=params).text
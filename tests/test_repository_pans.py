@@ -1,7 +1,23 @@
+import pytest
+from sqlalchemy import event
+
 from app.models import PanCreate, PanUpdate
 from app.repositories import pans as pans_repo
 
 
+@pytest.fixture()
+def statements(db):
+    recorded = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(" ".join(statement.split()))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", _record)
+
+
 class TestListPans:
     def test_empty(self, db):
         assert pans_repo.list_pans(db) == []
@@ -58,28 +74,177 @@ class TestCreatePan:
 
 class TestUpdatePan:
     def test_update_name(self, db, sample_pan):
-        updated = pans_repo.update_pan(db, sample_pan, PanUpdate(name="Renamed"))
+        updated = pans_repo.update_pan(db, sample_pan.id, PanUpdate(name="Renamed"))
         assert updated.name == "Renamed"
         assert updated.weight_grams == 500  # unchanged
 
     def test_update_weight(self, db, sample_pan):
-        updated = pans_repo.update_pan(db, sample_pan, PanUpdate(weight_grams=999))
+        updated = pans_repo.update_pan(db, sample_pan.id, PanUpdate(weight_grams=999))
         assert updated.weight_grams == 999
 
     def test_update_capacity_to_none_becomes_empty(self, db, sample_pan):
-        updated = pans_repo.update_pan(db, sample_pan, PanUpdate(capacity_label=None))
+        updated = pans_repo.update_pan(db, sample_pan.id, PanUpdate(capacity_label=None))
         assert updated.capacity_label == ""
 
     def test_no_op_update(self, db, sample_pan):
-        updated = pans_repo.update_pan(db, sample_pan, PanUpdate())
+        updated = pans_repo.update_pan(db, sample_pan.id, PanUpdate())
         assert updated.name == "Sheet Pan"
 
 
+class TestWriteRoundTrips:
+    def test_create_is_one_statement(self, db, statements):
+        pan = pans_repo.create_pan(db, PanCreate(name="Skillet", weight_grams=1200))
+        assert len(statements) == 1
+        assert statements[0].startswith("INSERT INTO pans")
+        assert "RETURNING" in statements[0]
+        assert pan.id is not None
+        assert pan.created_at is not None
+        assert pan.updated_at is not None
+
+    def test_update_is_one_statement(self, db, sample_pan, statements):
+        db.expunge_all()
+        updated = pans_repo.update_pan(db, sample_pan.id, PanUpdate(weight_grams=520))
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE pans")
+        assert "WHERE pans.id = ?" in statements[0]
+        assert "RETURNING" in statements[0]
+        assert updated.weight_grams == 520
+        assert updated.name == "Sheet Pan"
+        assert updated.updated_at is not None
+
+    def test_delete_is_one_statement(self, db, sample_pan, statements):
+        assert pans_repo.delete_pan(db, sample_pan.id) is True
+        assert len(statements) == 1
+        assert statements[0].startswith("DELETE FROM pans WHERE pans.id = ?")
+
+    def test_missing_pan(self, db, statements):
+        assert pans_repo.update_pan(db, 9999, PanUpdate(weight_grams=520)) is None
+        assert pans_repo.delete_pan(db, 9999) is False
+        assert len(statements) == 2
+
+    def test_without_returning_reads_back_once(self, db, statements, monkeypatch):
+        # Patched before anything is compiled, as statements are cached per engine.
+        dialect = db.get_bind().dialect
+        monkeypatch.setattr(dialect, "insert_returning", False)
+        monkeypatch.setattr(dialect, "update_returning", False)
+        pan = pans_repo.create_pan(db, PanCreate(name="Skillet", weight_grams=1200))
+        assert pan.created_at is not None
+        updated = pans_repo.update_pan(db, pan.id, PanUpdate(weight_grams=520))
+        assert updated.updated_at is not None
+        assert [statement.split()[0] for statement in statements] == ["INSERT", "SELECT", "UPDATE", "SELECT"]
+        assert not any("RETURNING" in statement for statement in statements)
+
+
 class TestDeletePan:
     def test_delete(self, db, sample_pan):
-        pans_repo.delete_pan(db, sample_pan)
+        pans_repo.delete_pan(db, sample_pan.id)
         assert pans_repo.get_pan(db, sample_pan.id) is None
 
     def test_list_empty_after_delete(self, db, sample_pan):
-        pans_repo.delete_pan(db, sample_pan)
+        pans_repo.delete_pan(db, sample_pan.id)
         assert pans_repo.list_pans(db) == []
+
+
+class TestGetPansByIds:
+    def test_returns_mapping(self, db, sample_pan):
+        other = pans_repo.create_pan(db, PanCreate(name="Pot", weight_grams=900))
+        result = pans_repo.get_pans_by_ids(db, [sample_pan.id, other.id, sample_pan.id])
+        assert set(result) == {sample_pan.id, other.id}
+        assert result[other.id].name == "Pot"
+
+    def test_missing_ids_omitted(self, db, sample_pan):
+        assert list(pans_repo.get_pans_by_ids(db, [sample_pan.id, 9999])) == [sample_pan.id]
+
+    def test_empty(self, db):
+        assert pans_repo.get_pans_by_ids(db, []) == {}
+
+
+class TestHasPans:
+    def test_empty(self, db):
+        assert pans_repo.has_pans(db) is False
+        assert pans_repo.count_pans(db) == 0
+
+    def test_with_pans(self, db, sample_pan):
+        pans_repo.create_pan(db, PanCreate(name="Pot", weight_grams=900))
+        assert pans_repo.has_pans(db) is True
+        assert pans_repo.count_pans(db) == 2
+
+    def test_answered_from_memory(self, db, sample_pan):
+        from app.repositories.catalog import pan_catalog
+
+        assert pans_repo.has_pans(db) is True
+        assert pans_repo.has_pans(db) is True
+        assert pan_catalog.stats()["hits"] == 1
+        assert pan_catalog.stats()["misses"] == 1
+
+    def test_delete_invalidates(self, db, sample_pan):
+        assert pans_repo.has_pans(db) is True
+        pans_repo.delete_pan(db, sample_pan.id)
+        assert pans_repo.has_pans(db) is False
+        assert pans_repo.count_pans(db) == 0
+
+
+class TestListPansPage:
+    def test_pages(self, db):
+        for name in ["C", "A", "B"]:
+            pans_repo.create_pan(db, PanCreate(name=name, weight_grams=100))
+        page, next_key = pans_repo.list_pans_page(db, 2)
+        assert [p.name for p in page] == ["A", "B"]
+        assert next_key == ("B", page[1].id)
+        page, next_key = pans_repo.list_pans_page(db, 2, after=next_key)
+        assert [p.name for p in page] == ["C"]
+        assert next_key is None
+
+    def test_prefix_and_capacity(self, db):
+        pans_repo.create_pan(db, PanCreate(name="Sheet", weight_grams=100, capacity_label="Half"))
+        pans_repo.create_pan(db, PanCreate(name="Sheet", weight_grams=100, capacity_label="Full"))
+        pans_repo.create_pan(db, PanCreate(name="Skillet", weight_grams=100, capacity_label="Half"))
+        page, _ = pans_repo.list_pans_page(db, 10, name_prefix="Sh", capacity_label="Half")
+        assert [(p.name, p.capacity_label) for p in page] == [("Sheet", "Half")]
+
+
+class TestUpsertPans:
+    def test_inserts_and_updates(self, db, sample_pan):
+        existing = pans_repo.upsert_pans(
+            db,
+            [PanCreate(name="Sheet Pan", weight_grams=520, capacity_label="Half"), PanCreate(name="Wok", weight_grams=900)],
+        )
+        assert existing == {("Sheet Pan", "Half")}
+        db.expire_all()
+        assert pans_repo.get_pan(db, sample_pan.id).weight_grams == 520
+        assert pans_repo.count_pans(db) == 2
+
+    def test_skip_leaves_existing(self, db, sample_pan):
+        pans_repo.upsert_pans(db, [PanCreate(name="Sheet Pan", weight_grams=520, capacity_label="Half")], "skip")
+        db.expire_all()
+        assert pans_repo.get_pan(db, sample_pan.id).weight_grams == 500
+
+    def test_generic_fallback(self, db, sample_pan, monkeypatch):
+        monkeypatch.setattr(pans_repo, "upsert_insert", lambda db, entity: None)
+        existing = pans_repo.upsert_pans(
+            db,
+            [PanCreate(name="Sheet Pan", weight_grams=520, capacity_label="Half"), PanCreate(name="Wok", weight_grams=900)],
+        )
+        assert existing == {("Sheet Pan", "Half")}
+        db.expire_all()
+        assert pans_repo.get_pan(db, sample_pan.id).weight_grams == 520
+        assert pans_repo.count_pans(db) == 2
+
+    @pytest.mark.parametrize("fallback", [False, True])
+    def test_missing_notes_keep_existing(self, db, monkeypatch, fallback):
+        if fallback:
+            monkeypatch.setattr(pans_repo, "upsert_insert", lambda db, entity: None)
+        pans_repo.create_pan(db, PanCreate(name="Skillet", weight_grams=1800, notes="Seasoned"))
+        pans_repo.create_pan(db, PanCreate(name="Wok", weight_grams=900, notes="Carbon steel"))
+        pans_repo.upsert_pans(
+            db,
+            [PanCreate(name="Skillet", weight_grams=1900), PanCreate(name="Wok", weight_grams=950, notes="Flat bottom")],
+        )
+        db.expire_all()
+        pans = {pan.name: pan for pan in pans_repo.list_pans(db)}
+        assert (pans["Skillet"].weight_grams, pans["Skillet"].notes) == (1900, "Seasoned")
+        assert (pans["Wok"].weight_grams, pans["Wok"].notes) == (950, "Flat bottom")
+
+    def test_search_index_follows_upserts(self, db):
+        pans_repo.upsert_pans(db, [PanCreate(name="Dutch Oven", weight_grams=4000)])
+        assert [pan.name for pan in pans_repo.search_pans(db, "dutch", 10)] == ["Dutch Oven"]
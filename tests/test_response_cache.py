@@ -0,0 +1,69 @@
+from app.web.response_cache import ResponseCache
+from app.web.routes.calc import mini_cache
+
+
+class TestResponseCache:
+    def test_get_put(self):
+        cache = ResponseCache(maxsize=2)
+        assert cache.get((1, "a")) is None
+        cache.put((1, "a"), b"body")
+        assert cache.get((1, "a")) == b"body"
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put((1, "a"), b"a")
+        cache.put((1, "b"), b"b")
+        cache.get((1, "a"))
+        cache.put((1, "c"), b"c")
+        assert cache.get((1, "b")) is None
+        assert cache.get((1, "a")) == b"a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_evict_pan(self):
+        cache = ResponseCache(maxsize=10)
+        cache.put((1, "a"), b"a")
+        cache.put((2, "a"), b"a")
+        cache.evict_pan(1)
+        assert cache.get((1, "a")) is None
+        assert cache.get((2, "a")) == b"a"
+        cache.evict_pan(None)
+        assert cache.stats()["size"] == 0
+
+    def test_zero_size_disables(self):
+        cache = ResponseCache(maxsize=0)
+        cache.put((1, "a"), b"a")
+        assert cache.get((1, "a")) is None
+
+
+class TestMiniViewCache:
+    def _params(self, pan_id, **overrides):
+        params = {"pan_id": pan_id, "total_weight_grams": 1500, "total_carbs": 100, "view": "mini"}
+        params.update(overrides)
+        return params
+
+    def test_repeat_open_served_from_cache(self, client, sample_pan):
+        first = client.get("/calc", params=self._params(sample_pan.id))
+        second = client.get("/calc", params=self._params(sample_pan.id))
+        assert first.text == second.text
+        assert mini_cache.stats()["hits"] == 1
+        assert mini_cache.stats()["size"] == 1
+
+    def test_equivalent_queries_share_entry(self, client, sample_pan):
+        client.get("/calc", params=self._params(sample_pan.id, total_weight_grams="1500"))
+        client.get("/calc", params=self._params(sample_pan.id, total_weight_grams="1500.0", target_min_grams=200))
+        assert mini_cache.stats()["hits"] == 1
+
+    def test_edit_evicts_entries(self, client, sample_pan):
+        assert "1000.0" in client.get("/calc", params=self._params(sample_pan.id)).text
+        client.put(f"/api/pans/{sample_pan.id}", json={"weight_grams": 700})
+        assert mini_cache.stats()["size"] == 0
+        assert "800.0" in client.get("/calc", params=self._params(sample_pan.id)).text
+
+    def test_errors_not_cached(self, client, sample_pan):
+        client.get("/calc", params=self._params(sample_pan.id, total_weight_grams=100))
+        assert mini_cache.stats()["size"] == 0
+
+    def test_stats_in_health(self, client, sample_pan):
+        client.get("/calc", params=self._params(sample_pan.id))
+        assert client.get("/health").json()["mini_cache"]["misses"] == 1
@@ -0,0 +1,106 @@
+import gzip
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.web.static import IMMUTABLE, AssetFiles, AssetManifest, assets, compress_assets
+
+
+@pytest.fixture()
+def asset_dir(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 50)
+    return tmp_path
+
+
+@pytest.fixture()
+def asset_client(asset_dir):
+    manifest = AssetManifest(asset_dir)
+    app = FastAPI()
+    app.mount("/static", AssetFiles(manifest), name="static")
+    with TestClient(app) as client:
+        yield client, manifest
+
+
+class TestManifest:
+    def test_fingerprint_changes_with_content(self, asset_dir):
+        before = AssetManifest(asset_dir).url("css/site.css")
+        (asset_dir / "css" / "site.css").write_text("body { color: blue; }\n")
+        after = AssetManifest(asset_dir).url("css/site.css")
+        assert re.fullmatch(r"/static/css/site\.[0-9a-f]{10}\.css", before)
+        assert before != after
+
+    def test_compressed_variants_not_fingerprinted(self, asset_dir):
+        compress_assets(asset_dir)
+        assert list(AssetManifest(asset_dir).fingerprints) == ["css/site.css"]
+
+    def test_unknown_asset_raises(self, asset_dir):
+        with pytest.raises(KeyError):
+            AssetManifest(asset_dir).url("css/missing.css")
+
+
+class TestAssetFiles:
+    def test_fingerprinted_is_immutable(self, asset_client):
+        client, manifest = asset_client
+        resp = client.get(manifest.url("css/site.css"), headers={"accept-encoding": "identity"})
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == IMMUTABLE
+        assert resp.headers["content-type"].startswith("text/css")
+        assert "content-encoding" not in resp.headers
+
+    def test_serves_gzip_variant(self, asset_client, asset_dir):
+        client, manifest = asset_client
+        compress_assets(asset_dir)
+        url = manifest.url("css/site.css")
+        resp = client.get(url, headers={"accept-encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["content-type"].startswith("text/css")
+        assert int(resp.headers["content-length"]) == (asset_dir / "css" / "site.css.gz").stat().st_size
+        assert resp.text == (asset_dir / "css" / "site.css").read_text()
+
+    def test_refused_encoding_not_served(self, asset_client, asset_dir):
+        client, manifest = asset_client
+        compress_assets(asset_dir)
+        (asset_dir / "css" / "site.css.br").write_bytes(b"not for this client")
+        resp = client.get(manifest.url("css/site.css"), headers={"accept-encoding": "br;q=0, gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+
+    def test_gzip_variant_is_deterministic(self, asset_dir):
+        compress_assets(asset_dir)
+        first = (asset_dir / "css" / "site.css.gz").read_bytes()
+        (asset_dir / "css" / "site.css.gz").unlink()
+        compress_assets(asset_dir)
+        assert (asset_dir / "css" / "site.css.gz").read_bytes() == first
+        assert gzip.decompress(first) == (asset_dir / "css" / "site.css").read_bytes()
+
+    def test_unhashed_path_not_immutable(self, asset_client):
+        client, _ = asset_client
+        resp = client.get("/static/css/site.css")
+        assert resp.status_code == 200
+        assert resp.headers.get("cache-control") != IMMUTABLE
+
+    def test_stale_hash_is_404(self, asset_client):
+        client, _ = asset_client
+        assert client.get("/static/css/site.0000000000.css").status_code == 404
+
+
+class TestPages:
+    def test_pages_reference_local_assets(self, client):
+        html = client.get("/pans").text
+        assert "cdn.jsdelivr.net" not in html
+        assert "<style>" not in html
+        assert assets.url("vendor/bootstrap/bootstrap.min.css") in html
+        assert assets.url("js/theme.js") in html
+
+    def test_asset_served_from_app(self, client):
+        resp = client.get(assets.url("css/app.css"))
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == IMMUTABLE
+
+    def test_asset_requests_grouped_in_metrics(self, client):
+        client.get(assets.url("css/app.css"))
+        routes = {route for _, route, _ in metrics.request_seconds.snapshot()}
+        assert routes == {"/static/{path}"}
@@ -0,0 +1,61 @@
+import os
+
+from app import metrics
+from app.web import templates as templates_module
+from app.web.templates import build_templates, precompile_templates, templates_fingerprint
+
+
+class TestTemplateModes:
+    def test_development_reloads_without_bytecode_cache(self):
+        env = build_templates().env
+        assert env.auto_reload is True
+        assert env.bytecode_cache is None
+
+    def test_production_caches_bytecode(self, tmp_path):
+        env = build_templates(production=True, cache_dir=str(tmp_path / "jinja")).env
+        assert env.auto_reload is False
+        count = precompile_templates(env)
+        assert count == 5
+        assert len(list((tmp_path / "jinja").iterdir())) == count
+
+    def test_precompile_fills_environment_cache(self, tmp_path):
+        env = build_templates(production=True, cache_dir=str(tmp_path)).env
+        precompile_templates(env)
+        loads = sum(sum(counts) for counts, _ in metrics.template_load_seconds.snapshot().values())
+        env.get_template("calc/mini.html")
+        assert sum(sum(counts) for counts, _ in metrics.template_load_seconds.snapshot().values()) == loads
+
+    def test_render_keeps_globals(self, tmp_path):
+        env = build_templates(production=True, cache_dir=str(tmp_path)).env
+        assert "version" in env.globals
+        assert "url_for" in env.globals
+
+
+class TestTemplatesFingerprint:
+    def test_stamped_once_per_process(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(templates_module, "_templates_dir", tmp_path)
+        monkeypatch.setattr(templates_module, "TEMPLATE_MODE", "production")
+        templates_module._source_stamp.cache_clear()
+        try:
+            page = tmp_path / "page.html"
+            page.write_text("<p>one</p>")
+            before = templates_fingerprint()
+            page.write_text("<p>two, longer</p>")
+            assert templates_fingerprint() == before
+        finally:
+            templates_module._source_stamp.cache_clear()
+
+    def test_development_follows_template_reloads(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(templates_module, "_templates_dir", tmp_path)
+        page = tmp_path / "page.html"
+        page.write_text("<p>one</p>")
+        templates = build_templates()
+        monkeypatch.setattr(templates_module, "templates", templates)
+        templates.env.get_template("page.html")
+        before = templates_fingerprint()
+        assert templates.env.get_template("page.html").render() == "<p>one</p>"
+        assert templates_fingerprint() == before
+        page.write_text("<p>two</p>")
+        os.utime(page, ns=(page.stat().st_atime_ns, page.stat().st_mtime_ns + 1_000_000_000))
+        assert templates.env.get_template("page.html").render() == "<p>two</p>"
+        assert templates_fingerprint() != before
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+import app
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestVersion:
+    def test_matches_pyproject(self):
+        with (_ROOT / "pyproject.toml").open("rb") as f:
+            expected = tomllib.load(f)["project"]["version"]
+        assert app.get_version() == expected
+        assert app.__version__ == app.get_version()
+
+    def test_cached(self):
+        assert app.get_version() is app.get_version()
+
+    def test_unknown_attribute(self):
+        try:
+            app.not_a_thing
+        except AttributeError as exc:
+            assert "not_a_thing" in str(exc)
+        else:
+            raise AssertionError("expected AttributeError")
+
+    def test_not_resolved_on_import(self):
+        code = "import app.main, app; print(app.get_version.cache_info().currsize)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"DATABASE_URL": "sqlite://", "PATH": ""},
+        )
+        assert result.stdout.strip() == "0"
+
+    def test_rendered_in_nav(self, client):
+        assert f"v{app.get_version()}" in client.get("/pans").text
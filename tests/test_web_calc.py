@@ -14,6 +14,33 @@ class TestCalcPage:
         assert "Add a pan first" in resp.text
 
 
+class TestCalcPageLargeCatalog:
+    def test_search_box_instead_of_full_dropdown(self, client, db, sample_pan, monkeypatch):
+        from app.db_models import Pan
+        from app.web.routes import calc as calc_routes
+
+        monkeypatch.setattr(calc_routes, "INLINE_PAN_LIMIT", 2)
+        db.add_all([Pan(name=f"Extra {i}", weight_grams=100) for i in range(3)])
+        db.commit()
+        resp = client.get("/calc")
+        assert resp.status_code == 200
+        assert 'id="panSearch"' in resp.text
+        assert "Extra 1" not in resp.text
+        assert "Add a pan first" not in resp.text
+
+    def test_selected_pan_still_rendered(self, client, db, sample_pan, monkeypatch):
+        from app.db_models import Pan
+        from app.web.routes import calc as calc_routes
+
+        monkeypatch.setattr(calc_routes, "INLINE_PAN_LIMIT", 2)
+        db.add_all([Pan(name=f"Extra {i}", weight_grams=100) for i in range(3)])
+        db.commit()
+        resp = client.get("/calc", params={"pan_id": sample_pan.id, "total_weight_grams": 1500, "total_carbs": 100})
+        assert resp.status_code == 200
+        assert "Sheet Pan (Half)" in resp.text
+        assert "Extra 1" not in resp.text
+
+
 class TestCalcSubmit:
     def test_basic_submission(self, client, sample_pan):
         resp = client.post("/calc", data={
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.db_models import PanUsage, WeighIn
+from app.metrics import render_metrics
+from app.repositories import pan_usage as pan_usage_repo
+from app.write_behind import WriteBatch, WriteBehindQueue, write_batch, write_behind
+
+
+class TestWriteBatch:
+    def test_coalesces_pan_uses(self, weigh_in_row):
+        now = datetime.now(UTC)
+        batch = WriteBatch()
+        batch.add("pan_use", (1, now))
+        batch.add("pan_use", (1, now - timedelta(minutes=1)))
+        batch.add("pan_use", (2, now))
+        batch.add("weigh_in", weigh_in_row())
+        assert batch.pan_uses == {1: (2, now), 2: (1, now)}
+        assert batch.ops == 4
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            WriteBatch().add("nope", None)
+
+
+class TestPanUsage:
+    def test_accumulates(self, db, sample_pan):
+        now = datetime.now(UTC)
+        pan_usage_repo.add_pan_usage(db, {sample_pan.id: (2, now - timedelta(hours=1))})
+        pan_usage_repo.add_pan_usage(db, {sample_pan.id: (3, now)})
+        pan_usage_repo.add_pan_usage(db, {sample_pan.id: (1, now - timedelta(days=1))})
+        db.commit()
+        [usage] = pan_usage_repo.list_recent_usage(db, 10)
+        assert usage.use_count == 6
+        assert usage.last_used_at.replace(tzinfo=UTC) == now
+
+    def test_generic_fallback(self, db, sample_pan, monkeypatch):
+        monkeypatch.setattr(pan_usage_repo, "upsert_insert", lambda db, entity: None)
+        now = datetime.now(UTC)
+        pan_usage_repo.add_pan_usage(db, {sample_pan.id: (1, now - timedelta(hours=1))})
+        pan_usage_repo.add_pan_usage(db, {sample_pan.id: (1, now)})
+        db.commit()
+        [usage] = pan_usage_repo.list_recent_usage(db, 10)
+        assert usage.use_count == 2
+        assert usage.last_used_at.replace(tzinfo=UTC) == now
+
+    def test_deleted_pans_hidden(self, db):
+        pan_usage_repo.add_pan_usage(db, {999: (1, datetime.now(UTC))})
+        db.commit()
+        assert pan_usage_repo.list_recent_usage(db, 10) == []
+
+
+class TestWriteBehindQueue:
+    def test_not_running_rejects(self, weigh_in_row):
+        assert WriteBehindQueue().submit("weigh_in", weigh_in_row()) is False
+
+    def test_batches_into_one_transaction(self, db, sessions, sample_pan, weigh_in_row, count_rows):
+        batches = []
+
+        def write(session, batch):
+            batches.append(batch.ops)
+            write_batch(session, batch)
+
+        async def scenario():
+            queue = WriteBehindQueue(write, batch_size=1000, flush_seconds=60, session_factory=sessions)
+            await queue.start()
+            for _ in range(5):
+                queue.submit("weigh_in", weigh_in_row(sample_pan.id))
+                queue.submit("pan_use", (sample_pan.id, datetime.now(UTC)))
+            assert queue.depth == 10
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(scenario())
+        assert batches == [10]
+        assert queue.stats()["written"] == 10
+        assert count_rows(WeighIn) == 5
+        assert pan_usage_repo.list_recent_usage(db, 10)[0].use_count == 5
+
+    def test_flushes_at_batch_size(self, sessions, weigh_in_row):
+        batches = []
+
+        async def scenario():
+            queue = WriteBehindQueue(lambda db, batch: batches.append(batch.ops), batch_size=3, flush_seconds=60, session_factory=sessions)
+            await queue.start()
+            for _ in range(7):
+                queue.submit("weigh_in", weigh_in_row())
+            await asyncio.sleep(0.1)
+            flushed_before_stop = list(batches)
+            await queue.stop()
+            return flushed_before_stop
+
+        assert asyncio.run(scenario()) == [3, 3]
+        assert batches == [3, 3, 1]
+
+    def test_flushes_after_interval(self, sessions, weigh_in_row):
+        batches = []
+
+        async def scenario():
+            queue = WriteBehindQueue(lambda db, batch: batches.append(batch.ops), flush_seconds=0.05, session_factory=sessions)
+            await queue.start()
+            queue.submit("weigh_in", weigh_in_row())
+            await asyncio.sleep(0.3)
+            flushed = list(batches)
+            await queue.stop()
+            return flushed
+
+        assert asyncio.run(scenario()) == [1]
+
+    def test_failed_flush_retried(self, sessions, weigh_in_row):
+        batches = []
+
+        def write(db, batch):
+            batches.append(batch.ops)
+            if len(batches) == 1:
+                raise RuntimeError("database is locked")
+
+        async def scenario():
+            queue = WriteBehindQueue(write, flush_seconds=0.02, session_factory=sessions)
+            await queue.start()
+            queue.submit("weigh_in", weigh_in_row())
+            await asyncio.sleep(0.2)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(scenario())
+        assert batches == [1, 1]
+        assert queue.stats()["failed_flushes"] == 1
+        assert queue.stats()["written"] == 1
+
+    def test_metrics(self, sessions, weigh_in_row):
+        async def scenario():
+            queue = WriteBehindQueue(lambda db, batch: None, session_factory=sessions)
+            await queue.start()
+            queue.submit("weigh_in", weigh_in_row())
+            await queue.stop()
+
+        asyncio.run(scenario())
+        text = render_metrics()
+        assert "carbsmart_write_behind_flush_seconds_count 1" in text
+        assert "carbsmart_write_behind_batch_ops_count 1" in text
+        assert "carbsmart_write_behind_queue_depth 0.0" in text
+
+
+class TestWriteBehindApp:
+    @pytest.fixture()
+    def running(self, client, sessions, monkeypatch):
+        monkeypatch.setattr(write_behind, "session_factory", sessions)
+        client.portal.call(write_behind.start)
+        yield write_behind
+        client.portal.call(write_behind.stop)
+        write_behind.clear()
+
+    def test_calculations_recorded_on_drain(self, client, db, sample_pan, running, monkeypatch, count_rows):
+        from app.history import weigh_in_log
+
+        monkeypatch.setattr(weigh_in_log, "enabled", True)
+        body = {"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100}
+        for _ in range(3):
+            assert client.post("/api/calc", json=body).status_code == 200
+        assert client.get("/health").json()["write_behind"]["running"] is True
+        client.portal.call(running.stop)
+
+        assert count_rows(WeighIn) == 3
+        assert weigh_in_log.stats()["pending"] == 0
+        usage = client.get("/api/pans/usage").json()
+        assert usage[0]["pan_id"] == sample_pan.id
+        assert usage[0]["use_count"] == 3
+
+    def test_usage_counted_without_history(self, client, db, sample_pan, running, count_rows):
+        client.post("/api/calc", json={"total_weight_grams": 1500, "pan_id": sample_pan.id, "total_carbs": 100})
+        client.portal.call(running.stop)
+        assert count_rows(WeighIn) == 0
+        assert count_rows(PanUsage) == 1